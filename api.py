@@ -1,10 +1,18 @@
-from flask import Flask, request, jsonify, render_template, redirect, url_for, session
+from flask import Flask, request, jsonify, render_template, redirect, url_for, session, make_response, g, has_request_context
+from flask.json.provider import DefaultJSONProvider
 import json
 import os
 from datetime import date, datetime, timedelta, time
 import math
-import copy
+import hashlib
+import threading
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
+from jinja2 import FileSystemBytecodeCache
 
 # Import availability logic from app.py
 import app as booking_app
@@ -24,6 +32,25 @@ LAST_START_TIME = time(21, 0)
 SLOT_MINUTES = 30
 BOOKING_DURATION_MINUTES = 150  # 2.5 hours default
 
+# The slot schedule is the same every day, so precompute offsets and labels
+_OPENING_MINUTES = OPENING_TIME.hour * 60 + OPENING_TIME.minute
+_LAST_START_MINUTES = LAST_START_TIME.hour * 60 + LAST_START_TIME.minute
+SLOT_OFFSETS_MIN = tuple(range(0, _LAST_START_MINUTES - _OPENING_MINUTES + 1, SLOT_MINUTES))
+SLOT_DELTAS = tuple(timedelta(minutes=m) for m in SLOT_OFFSETS_MIN)
+SLOT_LABELS = tuple(
+    f"{(_OPENING_MINUTES + m) // 60:02d}:{(_OPENING_MINUTES + m) % 60:02d}"
+    for m in SLOT_OFFSETS_MIN
+)
+
+# Calendar grid columns run from opening until 23:30, as minutes since midnight
+CALENDAR_CLOSING_TIME = time(23, 30)
+_CALENDAR_CLOSING_MINUTES = CALENDAR_CLOSING_TIME.hour * 60 + CALENDAR_CLOSING_TIME.minute
+CALENDAR_SLOT_MINUTES = tuple(range(_OPENING_MINUTES, _CALENDAR_CLOSING_MINUTES + 1, SLOT_MINUTES))
+CALENDAR_SLOT_TIMES = tuple(time(m // 60, m % 60) for m in CALENDAR_SLOT_MINUTES)
+
+# Shapes a table may be edited to
+_VALID_SHAPES = frozenset({"round", "square"})
+
 # Table combination rules for multi-table bookings
 # Used for AI/auto-assign and manual table combining
 TABLE_COMBINATIONS = [
@@ -45,6 +72,21 @@ USERS = {
 app = Flask(__name__)
 app.secret_key = os.environ.get("SECRET_KEY", "change-me-in-prod")  # needed for sessions
 
+try:
+    from flask_compress import Compress
+except ImportError:  # optional; responses are sent uncompressed without it
+    Compress = None
+
+if Compress is not None:
+    Compress(app)
+
+# Templates only change on deploy: in production, don't stat them on every
+# render and keep compiled bytecode across worker restarts. Debug servers
+# (flask run --debug, FLASK_DEBUG=1) keep Flask's template reloading.
+if not app.debug:
+    app.jinja_env.auto_reload = False
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+
 # Ensure browsers that request /favicon.ico get redirected to the PNG favicon
 @app.route('/favicon.ico')
 def favicon_redirect():
@@ -60,19 +102,237 @@ def inject_booking_dates():
         "max_booking_date": max_booking_date
     }
 
-def load_tables() -> list[dict]:
-    """Load tables from tables.json and normalise basic fields.
+try:
+    import orjson
+except ImportError:  # optional speed-up; fall back to the stdlib json module
+    orjson = None
 
-    - Always returns a list (possibly empty).
-    - Sets default flags for bookable / is_landmark.
-    - Ensures width/height have sensible defaults.
+
+def _json_loads(data):
+    """Parse a JSON document (bytes or str), using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialise obj as 2-space indented UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode("utf-8")
+
+
+class _OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson.
+
+    Output parses the same as DefaultJSONProvider's (sorted keys, RFC 822
+    dates via the same `default`) but is always compact unless indented,
+    keeps non-ASCII text as UTF-8 rather than \\u escapes and writes NaN as
+    null. Anything orjson can't handle the same way (non-str keys, other
+    dumps options, NaN/Infinity literals on input) goes through the stdlib
+    implementation.
+    """
+
+    _OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson else 0
+
+    def _dumps_bytes(self, obj, indent=None):
+        """orjson-encoded obj; raises TypeError where the stdlib path is needed."""
+        option = self._OPTIONS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        indent = kwargs.get("indent")
+        if indent not in (None, 2) or kwargs.keys() - {"indent", "separators"}:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._dumps_bytes(obj, indent).decode("utf-8")
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of going
+        # through a str (as the base class does via dumps)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if (self.compact is None and self._app.debug) or self.compact is False else None
+        try:
+            body = self._dumps_bytes(obj, indent) + b"\n"
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+    def loads(self, s, **kwargs):
+        if not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass
+        return super().loads(s, **kwargs)
+
+
+if orjson is not None:
+    # jsonify() and the templates' tojson filter then share the fast codec
+    app.json = _OrjsonProvider(app)
+
+
+# Parsed JSON cache: path -> (st_mtime_ns, st_size, normalised data, normaliser, views).
+# Entries are reused until the file changes on disk, so the read-mostly GET
+# routes don't re-open and re-parse the same files on every request.
+_json_cache = {}
+_json_cache_lock = threading.Lock()
+_JSON_CACHE_MAX_ENTRIES = 128
+
+
+def _cached_json_load(path, normalise=None):
+    """Load a JSON file, reusing the cached result while its mtime/size are unchanged.
+
+    `normalise` (optional) is applied once when the file is (re)parsed and its
+    result is what gets cached. Raises OSError / json.JSONDecodeError like a
+    plain json.loads would.
     """
+    key = str(path)
+    # Within a request, files are stat()ed and looked up once; later loads
+    # reuse the same snapshot (writes drop it via _invalidate_json_cache)
+    request_memo = g.setdefault("_json_data", {}) if has_request_context() else None
+    if request_memo is not None and key in request_memo:
+        return request_memo[key]
+
+    data = _cached_json_load_shared(key, normalise)
+    if request_memo is not None:
+        request_memo[key] = data
+    return data
+
+
+def _cached_json_load_shared(key, normalise):
+    """Process-wide part of _cached_json_load: the mtime/size-keyed LRU."""
+    st = os.stat(key)
+    with _json_cache_lock:
+        cached = _json_cache.pop(key, None)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            _json_cache[key] = cached  # re-insert to keep LRU order
+            return cached[2]
+
+    # Unbuffered: read() on the raw file sizes one buffer from fstat and
+    # fills it directly, without going through an intermediate 8 KB buffer
+    with open(key, "rb", buffering=0) as f:
+        data = _json_loads(f.read())
+    if normalise is not None:
+        data = normalise(data)
+
+    with _json_cache_lock:
+        if len(_json_cache) >= _JSON_CACHE_MAX_ENTRIES:
+            _json_cache.pop(next(iter(_json_cache)))
+        _json_cache[key] = (st.st_mtime_ns, st.st_size, data, normalise, {})
+    return data
+
+
+def _cached_json_view(path, normalise, view, build):
+    """Return build(data) for the cached contents of `path`.
+
+    The result is memoised under `view` alongside the cached file contents, so
+    it is rebuilt only when the file changes. `build` must not mutate data.
+    """
+    key = str(path)
+    data = _cached_json_load(key, normalise)
+    with _json_cache_lock:
+        entry = _json_cache.get(key)
+        if entry is not None and entry[2] is data and view in entry[4]:
+            return entry[4][view]
+
+    result = build(data)
+    with _json_cache_lock:
+        entry = _json_cache.get(key)
+        if entry is not None and entry[2] is data:
+            entry[4][view] = result
+    return result
+
+
+def _invalidate_json_cache(path):
+    """Drop the cached contents of `path` (call after writing the file)."""
+    with _json_cache_lock:
+        _json_cache.pop(str(path), None)
+    if has_request_context():
+        g.get("_json_data", {}).pop(str(path), None)
+
+
+def _write_json_file(path, obj):
+    """Atomically replace `path` with obj serialised as JSON.
+
+    The document is encoded up front and written to a temporary file in the
+    same directory, which is then renamed over `path`, so readers never see a
+    partially written file and an encoding error leaves the old file intact.
+    """
+    data = _json_dumps(obj)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
     try:
-        with open(TABLES_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except (OSError, json.JSONDecodeError):
-        return []
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _invalidate_json_cache(path)
+
+
+CACHE_REFRESH_SECONDS = 1.0
+_cache_refresher = None
+_cache_refresher_stop = threading.Event()
+
+
+def _refresh_json_cache():
+    """Re-parse cached files that changed on disk, plus today's bookings.
+
+    Runs in a daemon thread so request handlers usually find a warm cache,
+    until stop_cache_refresher() is called.
+    """
+    while not _cache_refresher_stop.is_set():
+        with _json_cache_lock:
+            entries = [(key, entry[3]) for key, entry in _json_cache.items()]
+        today_file = str(bookings_file_for_date(date.today().isoformat()))
+        if today_file not in dict(entries):
+            entries.append((today_file, _normalise_bookings))
+
+        for key, normalise in entries:
+            try:
+                _cached_json_load(key, normalise)
+            except Exception:
+                # Missing, half-written or malformed file; let the request path decide
+                _invalidate_json_cache(key)
+
+        _cache_refresher_stop.wait(CACHE_REFRESH_SECONDS)
+
+
+def start_cache_refresher():
+    """Start the background cache refresher, unless it is already running.
+
+    Called by the server entry points (``__main__``, wsgi.py), not on import,
+    so scripts and tests that import this module don't get a polling thread.
+    """
+    global _cache_refresher
+    if _cache_refresher is None or not _cache_refresher.is_alive():
+        _cache_refresher_stop.clear()
+        _cache_refresher = threading.Thread(
+            target=_refresh_json_cache, name="json-cache-refresher", daemon=True
+        )
+        _cache_refresher.start()
+
+
+def stop_cache_refresher(timeout=None):
+    """Signal the background cache refresher to exit and wait for it."""
+    global _cache_refresher
+    _cache_refresher_stop.set()
+    if _cache_refresher is not None:
+        _cache_refresher.join(timeout)
+        _cache_refresher = None
 
+
+def _normalise_tables(data):
     if not isinstance(data, list):
         return []
 
@@ -86,10 +346,68 @@ def load_tables() -> list[dict]:
 
     return data
 
+
+def load_tables() -> list[dict]:
+    """Load tables from tables.json and normalise basic fields.
+
+    - Always returns a list (possibly empty).
+    - Sets default flags for bookable / is_landmark.
+    - Ensures width/height have sensible defaults.
+    - Returns fresh table dicts, so callers may mutate them freely.
+    """
+    try:
+        data = _cached_json_load(TABLES_FILE, _normalise_tables)
+    except (OSError, json.JSONDecodeError):
+        return []
+
+    return [dict(t) if isinstance(t, dict) else t for t in data]
+
+def load_tables_indexed():
+    """load_tables() plus an id -> table dict over the same (fresh) dicts.
+
+    Where ids repeat, the first table wins, as with a linear search.
+    """
+    tables = load_tables()
+    by_id = {}
+    for t in tables:
+        if isinstance(t, dict):
+            by_id.setdefault(t.get("id"), t)
+    return tables, by_id
+
+def current_table_ids():
+    """Ids of the tables in tables.json as a Counter (empty if it can't be read).
+
+    A Counter keeps repeated ids, so comparing it with another Counter matches
+    comparing sorted id lists. Cached until tables.json changes; don't mutate it.
+    """
+    try:
+        return _cached_json_view(
+            TABLES_FILE, _normalise_tables, "id_counts",
+            lambda tables: Counter(int(t.get("id")) for t in tables if "id" in t),
+        )
+    except (OSError, json.JSONDecodeError):
+        return Counter()
+
+def load_bookable_tables_by_seats():
+    """Bookable tables sorted by seats, as (seat_counts, tables) for bisecting.
+
+    Cached until tables.json changes. The table dicts are shared; don't mutate.
+    """
+    def build(tables):
+        bookable = sorted(
+            (t for t in tables if isinstance(t, dict) and t.get("bookable", True)),
+            key=lambda t: t.get("seats", 0),
+        )
+        return [t.get("seats", 0) for t in bookable], bookable
+
+    try:
+        return _cached_json_view(TABLES_FILE, _normalise_tables, "bookable_by_seats", build)
+    except (OSError, json.JSONDecodeError):
+        return [], []
+
 def save_tables(tables):
     """Save tables list to tables.json"""
-    with open(TABLES_FILE, "w", encoding="utf-8") as f:
-        json.dump(tables, f, indent=2)
+    _write_json_file(TABLES_FILE, tables)
 
 def ensure_default_tables():
     """
@@ -99,8 +417,8 @@ def ensure_default_tables():
     # If file exists and has at least one table, do nothing
     if TABLES_FILE.exists():
         try:
-            with open(TABLES_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(TABLES_FILE, "rb", buffering=0) as f:
+                data = _json_loads(f.read())
             if isinstance(data, list) and len(data) > 0:
                 return
         except Exception:
@@ -161,8 +479,11 @@ def ensure_default_tables():
          "x": 350, "y": 350, "width": 60, "height": 60},
     ]
 
-    with open(TABLES_FILE, "w", encoding="utf-8") as f:
-        json.dump(default_tables, f, indent=2)
+    _write_json_file(TABLES_FILE, default_tables)
+
+# Create the default layout once per worker at startup rather than probing
+# tables.json on every request.
+ensure_default_tables()
 
 def _default_landmarks() -> dict:
     """Fallback positions + sizes for landmarks."""
@@ -191,23 +512,28 @@ def _default_landmarks() -> dict:
     }
 
 
-def load_landmarks() -> dict:
+_DEFAULT_LANDMARKS = _default_landmarks()
+
+
+def load_landmarks_shared() -> dict:
     """
     Load landmarks.json and normalise format.
 
     - New format: dict keyed by id ("entrance", "bar", "wc") with
       {x, y, width, height, label}.
     - Old format (e.g. list of objects) is auto-migrated to the new one.
-    """
-    if not os.path.exists(LANDMARKS_FILE):
-        return _default_landmarks()
 
+    Cached until landmarks.json changes. The dicts are shared; don't mutate.
+    """
     try:
-        with open(LANDMARKS_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        return _cached_json_load(LANDMARKS_FILE, _normalise_landmarks)
     except (OSError, json.JSONDecodeError):
-        return _default_landmarks()
+        # Missing or unreadable file
+        return _DEFAULT_LANDMARKS
+
 
+def _normalise_landmarks(data) -> dict:
+    """Normalise raw landmarks.json contents into the dict-keyed format."""
     # Already in the new dict format
     if isinstance(data, dict):
         for key, lm in list(data.items()):
@@ -284,21 +610,32 @@ def save_landmarks(landmarks: dict) -> None:
         return
 
     try:
-        with open(LANDMARKS_FILE, "w", encoding="utf-8") as f:
-            json.dump(landmarks, f, indent=2)
+        _write_json_file(LANDMARKS_FILE, landmarks)
     except OSError:
         # Fail silently in production; you can log if you like
         pass
 
 
-def load_constraints():
+def load_constraints_shared():
+    """Load the restaurant constraints ({} if there is no constraints file).
+
+    Cached until the constraints file changes. The data is shared; don't mutate.
+    """
     if CONSTRAINTS_FILE.exists():
-        with open(CONSTRAINTS_FILE, "r") as f:
-            return json.load(f)
+        return _cached_json_load(CONSTRAINTS_FILE)
     return {}
 
 def bookings_file_for_date(date_str):
-    return DATA_DIR / f"bookings_{date_str}.json"
+    try:
+        return _bookings_path(DATA_DIR, date_str)
+    except TypeError:
+        # Unhashable input (e.g. a list from a JSON body): build it uncached
+        return DATA_DIR / f"bookings_{date_str}.json"
+
+@lru_cache(maxsize=512)
+def _bookings_path(data_dir, date_str):
+    # Every booking request resolves the same few dates; reuse their Paths
+    return data_dir / f"bookings_{date_str}.json"
 
 def normalize_booking_tables(booking):
     """Normalize booking data to ensure tables is always a list.
@@ -339,19 +676,91 @@ def normalize_booking_tables(booking):
     
     return booking
 
+def normalize_name(name):
+    """Strip and title-case a guest name; non-string values pass through unchanged."""
+    if isinstance(name, str):
+        return name.strip().title()
+    return name
+
+def _normalise_bookings(bookings):
+    # Normalize all bookings to support multiple tables
+    return [normalize_booking_tables(b) for b in bookings]
+
 def load_bookings_for_date(date_str):
+    # Hand out copies so callers can edit/append without touching the cache
+    return [dict(b, tables=list(b["tables"])) for b in load_bookings_for_date_shared(date_str)]
+
+
+def load_bookings_for_date_shared(date_str):
+    """load_bookings_for_date() without the copies.
+
+    Cached until the day's file changes. The list and its bookings are shared;
+    don't mutate them (copy the list to append).
+    """
     filename = bookings_file_for_date(date_str)
     if filename.exists():
-        with open(filename, "r") as f:
-            bookings = json.load(f)
-            # Normalize all bookings to support multiple tables
-            return [normalize_booking_tables(b) for b in bookings]
+        return _cached_json_load(filename, _normalise_bookings)
     return []
 
+def total_party_size_for_date(date_str):
+    """Sum of party_size over the day's bookings, cached until the file changes."""
+    filename = bookings_file_for_date(date_str)
+    if not filename.exists():
+        return 0
+    return _cached_json_view(
+        filename, _normalise_bookings, "total_party_size",
+        lambda bookings: sum(b.get("party_size", 0) for b in bookings),
+    )
+
 def save_bookings_for_date(date_str, bookings):
     filename = bookings_file_for_date(date_str)
-    with open(filename, "w") as f:
-        json.dump(bookings, f, indent=4)
+    _write_json_file(filename, bookings)
+
+
+
+def _build_table_schedules(bookings, date_str):
+    """table_id -> (starts, entries) for the day's parseable bookings.
+
+    entries are (start_dt, end_dt, booking_index) sorted by start (stable,
+    so equal starts keep file order) and starts holds the start datetimes
+    for bisecting. Tables appear in the order of their first parseable
+    booking.
+    """
+    schedules = {}
+    for idx, b in enumerate(bookings):
+        table_id = b.get("table_id")
+        if table_id is None:
+            continue
+        start_time_str = b.get("start_time")
+        end_time_str = b.get("end_time")
+        if not start_time_str or not end_time_str:
+            continue
+        try:
+            date_str_booking = b.get("date", date_str)
+            start_dt = datetime.fromisoformat(f"{date_str_booking}T{start_time_str}")
+            end_dt = datetime.fromisoformat(f"{date_str_booking}T{end_time_str}")
+        except (ValueError, TypeError):
+            continue
+        schedules.setdefault(table_id, []).append((start_dt, end_dt, idx))
+
+    for table_id, entries in schedules.items():
+        entries.sort(key=itemgetter(0))
+        schedules[table_id] = ([e[0] for e in entries], entries)
+    return schedules
+
+
+def table_schedules_for_date(date_str):
+    """Cached _build_table_schedules() view of a day's bookings.
+
+    Returns (bookings, schedules); both are shared with the cache, don't mutate.
+    """
+    filename = bookings_file_for_date(date_str)
+    if not filename.exists():
+        return [], {}
+    return _cached_json_view(
+        filename, _normalise_bookings, ("table_schedules", date_str),
+        lambda bookings: (bookings, _build_table_schedules(bookings, date_str)),
+    )
 
 
 def get_bookings_for_day(current_date: date):
@@ -360,33 +769,77 @@ def get_bookings_for_day(current_date: date):
     Adds booking_index for template interactions (edit, drag & drop).
     """
     date_str = current_date.isoformat()
-    raw = load_bookings_for_date(date_str)
-    bookings_for_day = []
-    for idx, b in enumerate(raw):
-        b_copy = dict(b)
+    # load_bookings_for_date already hands out fresh dicts, so the derived
+    # fields can be filled in place without another copy.
+    bookings_for_day = load_bookings_for_date(date_str)
+    for idx, b in enumerate(bookings_for_day):
         # Ensure required derived fields
-        b_copy["date"] = b_copy.get("date", date_str)
-        b_copy["start_time"] = b_copy.get("start_time", "")
-        b_copy["end_time"] = b_copy.get("end_time", "")
-        b_copy["booking_index"] = idx
-        bookings_for_day.append(b_copy)
+        b.setdefault("date", date_str)
+        b.setdefault("start_time", "")
+        b.setdefault("end_time", "")
+        b["booking_index"] = idx
     return bookings_for_day
 
 
+# -------------------------
+# Conditional response helpers
+# -------------------------
+# Part of every ETag so a restart (e.g. a deploy with changed templates or
+# availability logic) never revalidates a stale response.
+_STARTUP_TOKEN = os.urandom(8).hex()
+
+
+def _file_stamp(path):
+    """(st_mtime_ns, st_size) for path, or (0, 0) if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (0, 0)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _make_etag(*parts):
+    """Build an ETag value from the inputs a response is derived from."""
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+def _not_modified(etag):
+    """Return a 304 response if the client already has `etag`, else None."""
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+        return _set_revalidate_headers(response, etag)
+    return None
+
+
+def _set_revalidate_headers(response, etag):
+    """Attach the ETag and ask clients to revalidate before reusing it."""
+    response.set_etag(etag)
+    response.cache_control.max_age = 0
+    response.cache_control.must_revalidate = True
+    return response
+
+
 # -------------------------
 # Time slot helpers
 # -------------------------
 def generate_time_slots(day):
     """Generate all 30-minute time slots from 17:00 to 21:00 for the given date."""
-    slots = []
-    current = datetime.combine(day, OPENING_TIME)
-    end = datetime.combine(day, LAST_START_TIME)
-    
-    while current <= end:
-        slots.append(current)
-        current += timedelta(minutes=SLOT_MINUTES)
-    
-    return slots
+    base = datetime.combine(day, OPENING_TIME)
+    return [base + delta for delta in SLOT_DELTAS]
+
+
+def parse_date_param(value):
+    """Parse a YYYY-MM-DD date, raising ValueError like strptime would.
+
+    Well-formed values take the C fromisoformat() path; anything else goes
+    through strptime so the accepted inputs stay exactly the same.
+    """
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+    return datetime.strptime(value, "%Y-%m-%d").date()
 
 
 def overlaps(start1, end1, start2, end2):
@@ -394,66 +847,126 @@ def overlaps(start1, end1, start2, end2):
     return start1 < end2 and start2 < end1
 
 
-def slot_has_free_table(slot_start, guests, tables, bookings_for_day):
+def _parse_booking_time(value, booking_date):
+    """Parse an ISO datetime or an HH:MM time (combined with booking_date)."""
+    if "T" in value:
+        # ISO datetime format
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    # Time-only format - combine with date
+    return datetime.fromisoformat(f"{booking_date}T{value}")
+
+
+def booking_intervals(bookings_for_day, day):
+    """Parse every booking's start/end once.
+
+    Returns a list of (table_id, start, end) tuples. start/end are None when a
+    booking's times can't be parsed; callers treat those as conflicts.
     """
-    Check if there's at least one table free for the given slot and guest count.
-    Returns True if a table is available, False otherwise.
+    default_date = day.isoformat()
+    intervals = []
+    for booking in bookings_for_day:
+        booking_date = booking.get("date", default_date)
+        try:
+            start = _parse_booking_time(booking.get("start_time", ""), booking_date)
+            end = _parse_booking_time(booking.get("end_time", ""), booking_date)
+        except (ValueError, TypeError, KeyError):
+            start = end = None
+        intervals.append((booking.get("table_id"), start, end))
+    return intervals
+
+
+def index_intervals_by_table(intervals):
+    """Group booking intervals per table for O(log n) overlap queries.
+
+    Returns {table_id: (starts, max_ends)} where `starts` is sorted and
+    `max_ends[i]` is the latest end among the first i+1 bookings. A table with
+    an unparseable booking maps to None (always treated as taken).
     """
-    slot_end = slot_start + timedelta(minutes=BOOKING_DURATION_MINUTES)
-    
-    # Filter tables that can accommodate the guests AND are bookable (exclude landmarks)
-    suitable_tables = [
-        t for t in tables 
-        if t.get("seats", 0) >= guests and t.get("bookable", True)
-    ]
-    
-    if not suitable_tables:
-        return False
+    grouped = {}
+    for table_id, start, end in intervals:
+        grouped.setdefault(table_id, []).append((start, end))
+
+    by_table = {}
+    for table_id, spans in grouped.items():
+        if any(start is None for start, _ in spans):
+            by_table[table_id] = None
+            continue
+        spans.sort(key=itemgetter(0))
+        starts = [start for start, _ in spans]
+        max_ends = []
+        latest = None
+        for _, end in spans:
+            if latest is None or end > latest:
+                latest = end
+            max_ends.append(latest)
+        by_table[table_id] = (starts, max_ends)
+    return by_table
+
+
+def load_booking_index_for_date(date_str, day):
+    """Per-table booking interval index (see index_intervals_by_table) for a date.
+
+    Built from the cached bookings and reused until the bookings file changes.
+    """
+    filename = bookings_file_for_date(date_str)
+    if not filename.exists():
+        return {}
+    return _cached_json_view(
+        filename,
+        _normalise_bookings,
+        ("by_table", day),
+        lambda bookings: index_intervals_by_table(booking_intervals(bookings, day)),
+    )
+
+
+def slots_with_free_table(slots, guests, tables, by_table):
+    """
+    Check every slot at once: returns one bool per slot, True if at least one
+    table fits the guest count and is free for the slot.
+    `by_table` is the output of index_intervals_by_table() for the slots' day.
+    """
+    duration = timedelta(minutes=BOOKING_DURATION_MINUTES)
+    # Slot windows are the same for every table; build them once
+    windows = [(slot_start, slot_start + duration) for slot_start in slots]
+    free = [False] * len(slots)
+    remaining = len(slots)
     
-    # Check each suitable table
-    for table in suitable_tables:
+    # Check each table that can accommodate the guests AND is bookable (exclude landmarks)
+    for table in tables:
+        if table.get("seats", 0) < guests or not table.get("bookable", True):
+            continue
+        
         table_id = table.get("id")
-        table_is_free = True
+        if table_id not in by_table:
+            return [True] * len(slots)
+        index = by_table[table_id]
+        if index is None:
+            # Couldn't parse one of this table's bookings; assume it conflicts
+            continue
         
-        # Check all bookings for this table
-        for booking in bookings_for_day:
-            if booking.get("table_id") != table_id:
+        # Bookings starting before a slot ends overlap it if any of them
+        # ends after the slot starts
+        starts, max_ends = index
+        for i, (slot_start, slot_end) in enumerate(windows):
+            if free[i]:
                 continue
-            
-            # Parse booking times
-            try:
-                booking_start_str = booking.get("start_time", "")
-                booking_end_str = booking.get("end_time", "")
-                
-                # Handle different time formats
-                if "T" in booking_start_str:
-                    # ISO datetime format
-                    booking_start = datetime.fromisoformat(booking_start_str.replace("Z", "+00:00"))
-                else:
-                    # Time-only format - combine with date
-                    booking_date = booking.get("date", slot_start.date().isoformat())
-                    booking_start = datetime.fromisoformat(f"{booking_date}T{booking_start_str}")
-                
-                if "T" in booking_end_str:
-                    booking_end = datetime.fromisoformat(booking_end_str.replace("Z", "+00:00"))
-                else:
-                    booking_date = booking.get("date", slot_start.date().isoformat())
-                    booking_end = datetime.fromisoformat(f"{booking_date}T{booking_end_str}")
-                
-                # Check for overlap
-                if overlaps(slot_start, slot_end, booking_start, booking_end):
-                    table_is_free = False
-                    break
-                    
-            except (ValueError, KeyError):
-                # If we can't parse the booking time, assume it conflicts to be safe
-                table_is_free = False
-                break
+            n = bisect_left(starts, slot_end)
+            if n == 0 or max_ends[n - 1] <= slot_start:
+                free[i] = True
+                remaining -= 1
         
-        if table_is_free:
-            return True
+        if remaining == 0:
+            break
     
-    return False
+    return free
+
+
+def slot_has_free_table(slot_start, guests, tables, by_table):
+    """
+    Check if there's at least one table free for the given slot and guest count.
+    Returns True if a table is available, False otherwise.
+    """
+    return slots_with_free_table([slot_start], guests, tables, by_table)[0]
 
 
 @app.route("/api/available-times")
@@ -470,29 +983,43 @@ def available_times():
         return jsonify({"error": "Missing date or guests parameter"}), 400
     
     try:
-        selected_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+        selected_date = parse_date_param(date_str)
         guests = int(guests_str)
     except (ValueError, TypeError):
         return jsonify({"error": "Invalid date or guests format"}), 400
     
-    # Load tables and bookings
-    ensure_default_tables()
-    tables = load_tables()
-    bookings = load_bookings_for_date(date_str)
+    # Availability only depends on the tables and that day's bookings (and the
+    # code computing it, hence the startup token)
+    etag = _make_etag(
+        _STARTUP_TOKEN,
+        date_str,
+        guests,
+        _file_stamp(TABLES_FILE),
+        _file_stamp(bookings_file_for_date(date_str)),
+    )
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+    
+    # Only tables with enough seats can take the party; the cached seat-sorted
+    # list lets us skip the rest with a bisect
+    seat_counts, tables_by_seats = load_bookable_tables_by_seats()
+    tables = tables_by_seats[bisect_left(seat_counts, guests):]
+    by_table = load_booking_index_for_date(date_str, selected_date)
     
     # Generate all time slots
     slots = generate_time_slots(selected_date)
     
-    # Check availability for each slot
+    # Check availability for all slots in one pass over the tables
+    availability = slots_with_free_table(slots, guests, tables, by_table)
     result = []
-    for slot in slots:
-        available = slot_has_free_table(slot, guests, tables, bookings)
+    for label, available in zip(SLOT_LABELS, availability):
         result.append({
-            "time": slot.strftime("%H:%M"),
+            "time": label,
             "available": available
         })
     
-    return jsonify(result)
+    return _set_revalidate_headers(jsonify(result), etag)
 
 
 @app.route("/calendar")
@@ -502,14 +1029,27 @@ def calendar():
         return redirect(url_for("login"))
 
     # Parse ?date=YYYY-MM-DD or default to today
+    today = date.today()
     date_str = request.args.get("date")
     if date_str:
         try:
-            current_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+            current_date = parse_date_param(date_str)
         except ValueError:
-            current_date = date.today()
+            current_date = today
     else:
-        current_date = date.today()
+        current_date = today
+
+    etag = _make_etag(
+        _STARTUP_TOKEN,
+        session["user"],
+        current_date.isoformat(),
+        today.isoformat(),
+        _file_stamp(TABLES_FILE),
+        _file_stamp(bookings_file_for_date(current_date.isoformat())),
+    )
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
 
     prev_date = current_date - timedelta(days=1)
     next_date = current_date + timedelta(days=1)
@@ -520,30 +1060,21 @@ def calendar():
     bookable_tables = [t for t in tables if t.get("bookable", True)]
     all_bookings = get_bookings_for_day(current_date)
 
-    # Generate time slots from 17:00 to 23:30
-    CLOSING_TIME = time(23, 30)
-    time_slots = []
-    dt = datetime.combine(current_date, OPENING_TIME)
-    last_dt = datetime.combine(current_date, CLOSING_TIME)
-    step = timedelta(minutes=SLOT_MINUTES)
-    while dt <= last_dt:
-        time_slots.append(dt)
-        dt += step
-
+    # Time slots from 17:00 to 23:30 are the same every day; work in
+    # minutes since midnight and let the template format the cached times
+    time_slots = CALENDAR_SLOT_TIMES
     num_slots = len(time_slots)
-    slot_length = timedelta(minutes=SLOT_MINUTES)
-    first_slot_dt = time_slots[0]
-    last_slot_end = time_slots[-1] + slot_length
+    first_slot_min = CALENDAR_SLOT_MINUTES[0]
+    last_slot_end = CALENDAR_SLOT_MINUTES[-1] + SLOT_MINUTES
 
     # Build bookings_by_table: table_id -> list of booking segments
-    bookings_by_table = {}
-    for t in bookable_tables:
-        table_id = str(t["id"])
-        bookings_by_table[table_id] = []
+    # Keyed by the (int) table id as stored; bookings are normalised so their
+    # table_id is an int as well, no str() round-trips needed.
+    bookings_by_table = {t["id"]: [] for t in bookable_tables}
 
     for booking_index, b in enumerate(all_bookings):
-        table_id = str(b.get("table_id", ""))
-        if not table_id or table_id not in bookings_by_table:
+        segments = bookings_by_table.get(b.get("table_id"))
+        if segments is None:
             continue
 
         # Parse start and end times
@@ -557,24 +1088,24 @@ def calendar():
             # Parse times as HH:MM
             start_h, start_m = map(int, start_time_str.split(":"))
             end_h, end_m = map(int, end_time_str.split(":"))
-            
-            start_dt = datetime.combine(current_date, time(start_h, start_m))
-            end_dt = datetime.combine(current_date, time(end_h, end_m))
         except (ValueError, AttributeError):
             continue
+        if not (0 <= start_h < 24 and 0 <= start_m < 60 and 0 <= end_h < 24 and 0 <= end_m < 60):
+            continue
+        start_min = start_h * 60 + start_m
+        end_min = end_h * 60 + end_m
 
         # Skip if completely out of range
-        if end_dt <= first_slot_dt or start_dt >= last_slot_end:
+        if end_min <= first_slot_min or start_min >= last_slot_end:
             continue
 
         # Calculate slot index and colspan
-        clamped_start = max(start_dt, first_slot_dt)
-        clamped_end = min(end_dt, last_slot_end)
+        clamped_start = max(start_min, first_slot_min)
+        clamped_end = min(end_min, last_slot_end)
 
-        offset_minutes = (clamped_start - first_slot_dt).total_seconds() / 60
-        slot_index = int(offset_minutes // SLOT_MINUTES)
+        slot_index = (clamped_start - first_slot_min) // SLOT_MINUTES
 
-        duration_minutes = (clamped_end - clamped_start).total_seconds() / 60
+        duration_minutes = clamped_end - clamped_start
         colspan = max(1, int(round(duration_minutes / SLOT_MINUTES)))
 
         # Create label
@@ -582,7 +1113,8 @@ def calendar():
         party_size = b.get("party_size", 0)
         label = f'{name} ({party_size})'
 
-        bookings_by_table[table_id].append({
+        segments.append({
+            "type": "booking",
             "slot_index": slot_index,
             "colspan": colspan,
             "label": label,
@@ -596,14 +1128,17 @@ def calendar():
         })
 
     # Sort segments by slot_index for each table
-    for table_id in bookings_by_table:
-        bookings_by_table[table_id].sort(key=lambda s: s["slot_index"])
+    for segments in bookings_by_table.values():
+        segments.sort(key=lambda s: s["slot_index"])
 
-    # Build row data for each table
+    # Build row data for each table. Empty cells are identical across rows and
+    # read-only in the template, so build them once and splice runs of them in.
+    empty_cells = [
+        {"type": "empty", "colspan": 1, "slot_index": i} for i in range(num_slots)
+    ]
     rows = []
     for table in bookable_tables:
-        table_id = str(table["id"])
-        segments = bookings_by_table.get(table_id, [])
+        segments = bookings_by_table.get(table["id"], [])
         
         cells = []
         current_slot = 0
@@ -611,46 +1146,22 @@ def calendar():
         for seg in segments:
             # Add empty cells before this booking
             if seg["slot_index"] > current_slot:
-                gap = seg["slot_index"] - current_slot
-                for i in range(gap):
-                    cells.append({
-                        "type": "empty",
-                        "colspan": 1,
-                        "slot_index": current_slot + i,
-                    })
+                cells.extend(empty_cells[current_slot:seg["slot_index"]])
                 current_slot = seg["slot_index"]
             
             # Add the booking cell
-            cells.append({
-                "type": "booking",
-                "colspan": seg["colspan"],
-                "label": seg["label"],
-                "booking": seg["booking"],
-                "booking_index": seg["booking_index"],
-                "slot_index": seg["slot_index"],
-                "name": seg["name"],
-                "party_size": seg["party_size"],
-                "start_time": seg["start_time"],
-                "end_time": seg["end_time"],
-                "notes": seg["notes"],
-            })
+            cells.append(seg)
             current_slot += seg["colspan"]
         
         # Fill remaining empty cells
-        while current_slot < num_slots:
-            cells.append({
-                "type": "empty",
-                "colspan": 1,
-                "slot_index": current_slot,
-            })
-            current_slot += 1
+        cells.extend(empty_cells[current_slot:])
         
         rows.append({
             "table": table,
             "cells": cells,
         })
 
-    return render_template(
+    response = make_response(render_template(
         "calendar.html",
         user=session["user"],
         active_page="calendar",
@@ -660,7 +1171,8 @@ def calendar():
         time_slots=time_slots,
         rows=rows,
         tables=bookable_tables,  # Only pass bookable tables to template
-    )
+    ))
+    return _set_revalidate_headers(response, etag)
 
 
 # -------------------------
@@ -668,14 +1180,11 @@ def calendar():
 # -------------------------
 def save_layout(tables):
     """Persist the given tables list to tables.json."""
-    with open(TABLES_FILE, "w") as f:
-        json.dump(tables, f, indent=4)
+    _write_json_file(TABLES_FILE, tables)
 
 
-def _rects_overlap(a, b):
-    ax, ay, aw, ah = a
-    bx, by, bw, bh = b
-    return not (ax + aw <= bx or bx + bw <= ax or ay + ah <= by or by + bh <= ay)
+# Table fields validate_layout reads, with the defaults it applies
+_VALIDATE_FIELDS = (("id", None), ("seats", 0), ("x", 0), ("y", 0), ("width", 0), ("height", 0))
 
 
 def validate_layout(tables, constraints):
@@ -687,7 +1196,42 @@ def validate_layout(tables, constraints):
     - Tables do not overlap
 
     Returns: { valid: bool, errors: [str], warnings: [str] }
+
+    Results are memoised on the fields actually checked, the room size and
+    the tables.json stamp (for the ID check), so re-validating an identical
+    layout is a cache hit.
     """
+    if not isinstance(tables, list) or len(tables) == 0:
+        return {"valid": False, "errors": ["Tables must be a non-empty list"], "warnings": []}
+
+    try:
+        room = (constraints or {}).get("room", {})
+        key = (
+            tuple(tuple(t.get(name, default) for name, default in _VALIDATE_FIELDS) for t in tables),
+            room.get("width", 0),
+            room.get("height", 0),
+            _file_stamp(TABLES_FILE),
+        )
+        hash(key)
+    except (AttributeError, TypeError):
+        # Malformed or unhashable input: validate directly
+        return _validate_layout(tables, constraints)
+
+    valid, errors, warnings = _validate_layout_cached(*key)
+    return {"valid": valid, "errors": list(errors), "warnings": list(warnings)}
+
+
+@lru_cache(maxsize=128)
+def _validate_layout_cached(rows, room_width, room_height, tables_stamp):
+    names = [name for name, _ in _VALIDATE_FIELDS]
+    result = _validate_layout(
+        [dict(zip(names, row)) for row in rows],
+        {"room": {"width": room_width, "height": room_height}},
+    )
+    return result["valid"], tuple(result["errors"]), tuple(result["warnings"])
+
+
+def _validate_layout(tables, constraints):
     errors = []
     warnings = []
 
@@ -731,24 +1275,307 @@ def validate_layout(tables, constraints):
 
         rects.append((x, y, w, h, tid))
 
-    # Overlap checks
-    for i in range(len(rects)):
-        ax, ay, aw, ah, aid = rects[i]
-        for j in range(i + 1, len(rects)):
-            bx, by, bw, bh, bid = rects[j]
-            if _rects_overlap((ax, ay, aw, ah), (bx, by, bw, bh)):
-                errors.append(f"Tables {aid} and {bid} overlap")
+    # Overlap checks: sweep left-to-right, only comparing against rects whose
+    # right edge is still past the current left edge. Edges are computed once
+    # up front; rects touching along an edge don't overlap.
+    lefts = [r[0] for r in rects]
+    tops = [r[1] for r in rects]
+    rights = [r[0] + r[2] for r in rects]
+    bottoms = [r[1] + r[3] for r in rects]
+    overlapping = []
+    active = []
+    for i in sorted(range(len(rects)), key=lefts.__getitem__):
+        bx, by, br, bb = lefts[i], tops[i], rights[i], bottoms[i]
+        active = [j for j in active if rights[j] > bx]
+        for j in active:
+            if not (rights[j] <= bx or br <= lefts[j] or bottoms[j] <= by or bb <= tops[j]):
+                overlapping.append((min(i, j), max(i, j)))
+        active.append(i)
+
+    # Report in the same (i, j) order as a pairwise scan
+    for i, j in sorted(overlapping):
+        errors.append(f"Tables {rects[i][4]} and {rects[j][4]} overlap")
 
     # ID preservation: compare with current tables.json ids
-    current = load_tables() or []
-    current_ids = sorted([int(t.get("id")) for t in current if "id" in t])
-    cand_ids_sorted = sorted(candidate_ids)
-    if current_ids and cand_ids_sorted != current_ids:
+    current_ids = current_table_ids()
+    if current_ids and Counter(candidate_ids) != current_ids:
         errors.append("Table IDs changed; IDs must be preserved")
 
     return {"valid": len(errors) == 0, "errors": errors, "warnings": warnings}
 
 
+def _grid_cells(x, y, w, h, half_gap, cell):
+    """Grid cells touched by a rectangle expanded by ``half_gap`` on every side."""
+    cx0 = int((x - half_gap) // cell)
+    cx1 = int((x + w + half_gap) // cell)
+    cy0 = int((y - half_gap) // cell)
+    cy1 = int((y + h + half_gap) // cell)
+    return [(gx, gy) for gx in range(cx0, cx1 + 1) for gy in range(cy0, cy1 + 1)]
+
+
+def _span_cells(x, y, w, h, cell, limit=None):
+    """Grid cells touched by the closed span of a rectangle (width/height may be negative).
+
+    Returns None instead if the span covers more than `limit` cells.
+    """
+    gx0, gx1 = sorted((int(x // cell), int((x + w) // cell)))
+    gy0, gy1 = sorted((int(y // cell), int((y + h) // cell)))
+    if limit is not None and (gx1 - gx0 + 1) * (gy1 - gy0 + 1) > limit:
+        return None
+    return [(gx, gy) for gx in range(gx0, gx1 + 1) for gy in range(gy0, gy1 + 1)]
+
+
+# Below this many no-go zones, testing every zone is cheaper than a grid
+_ZONE_GRID_MIN_ZONES = 8
+
+
+def _resolve_overlaps(xs, ys, ws, hs, min_gap, room_width, room_height, min_wall_clearance, iters=4):
+    """Push apart rectangles that are closer than ``min_gap``.
+
+    Numeric kernel for the relaxation step of ``optimize_layout``: works on
+    parallel lists of floats, updates ``xs``/``ys`` in place (rounded to whole
+    pixels and clamped to the room) and returns the sets of indexes whose x
+    and y coordinates were written.
+
+    Pairs are visited in the same (i, j) order as a full pairwise scan, but
+    only tables sharing a cell of a uniform grid are tested; the grid is kept
+    up to date as tables move so the result matches the full scan exactly.
+    """
+    n = len(xs)
+    half_gap = min_gap / 2.0
+    max_x = room_width - min_wall_clearance
+    max_y = room_height - min_wall_clearance
+    moved_x = set()
+    moved_y = set()
+
+    # Cell size ~3x the average table extent keeps a handful of tables per
+    # cell. Non-finite coordinates can't be bucketed; fall back to testing
+    # every pair in that case.
+    grid = None
+    cells_of = None
+    if n and all(math.isfinite(v) for v in (*xs, *ys, *ws, *hs)):
+        avg_extent = sum(max(w, h) for w, h in zip(ws, hs)) / n
+        cell = max(60.0, 3.0 * avg_extent, float(min_gap))
+        grid = {}
+        cells_of = []
+        for k in range(n):
+            cells = _grid_cells(xs[k], ys[k], ws[k], hs[k], half_gap, cell)
+            cells_of.append(cells)
+            for key in cells:
+                grid.setdefault(key, set()).add(k)
+
+    def rebucket(k):
+        for key in cells_of[k]:
+            grid[key].discard(k)
+        cells = _grid_cells(xs[k], ys[k], ws[k], hs[k], half_gap, cell)
+        cells_of[k] = cells
+        for key in cells:
+            grid.setdefault(key, set()).add(k)
+
+    def candidates(i, after, stale=None):
+        # Indexes above `after` that i may touch, ascending; with `stale`
+        # (a pair of sets), only those in either set
+        if grid is None:
+            if stale is not None:
+                return sorted(k for k in stale[0] | stale[1] if k > after)
+            return list(range(after + 1, n))
+        found = set()
+        for key in cells_of[i]:
+            found.update(grid[key])
+        if stale is not None:
+            return sorted(k for k in found if k > after and (k in stale[0] or k in stale[1]))
+        return sorted(k for k in found if k > after)
+
+    # Edges of every rectangle expanded by the gap requirement, kept in sync
+    # with xs/ys, so each pair test is two min/max comparisons per axis
+    lefts = [x - half_gap for x in xs]
+    rights = [x + w + half_gap for x, w in zip(xs, ws)]
+    tops = [y - half_gap for y in ys]
+    bottoms = [y + h + half_gap for y, h in zip(ys, hs)]
+
+    # A pair that was apart when last tested stays apart until one of its
+    # tables moves, so after the first sweep only pairs involving a table
+    # moved since the previous sweep need testing. None means "everything".
+    moved_before = None
+    for _ in range(iters):  # a few relaxation iterations
+        moved_any = False
+        moved_now = set()
+        for i in range(n):
+            i_stale = moved_before is None or i in moved_before or i in moved_now
+            # Until i itself moves, only partners moved since their last test
+            # can have come into range, so the rest are pruned up front (and
+            # the candidate list only changes when i moves)
+            pending = candidates(i, i, None if i_stale else (moved_before, moved_now))
+            pos = 0
+            l1, r1, t1, b1 = lefts[i], rights[i], tops[i], bottoms[i]
+            while pos < len(pending):
+                j = pending[pos]
+                pos += 1
+                overlap_x = min(r1, rights[j]) - max(l1, lefts[j])
+                if not overlap_x > 0:
+                    continue
+                overlap_y = min(b1, bottoms[j]) - max(t1, tops[j])
+                if not overlap_y > 0:
+                    continue
+                x1, y1, w1, h1 = xs[i], ys[i], ws[i], hs[i]
+                x2, y2, w2, h2 = xs[j], ys[j], ws[j], hs[j]
+                # Push apart along the smaller overlap axis; table i moves by
+                # +d and table j by -d, with d's sign set by the centre order
+                if overlap_x < overlap_y:
+                    d = overlap_x / 2.0
+                    if x1 + w1 / 2.0 <= x2 + w2 / 2.0:
+                        d = -d
+                    xs[i] = x1 = float(round(max(min_wall_clearance, min(x1 + d, max_x - w1))))
+                    xs[j] = x2 = float(round(max(min_wall_clearance, min(x2 - d, max_x - w2))))
+                    lefts[i], rights[i] = l1, r1 = x1 - half_gap, x1 + w1 + half_gap
+                    lefts[j], rights[j] = x2 - half_gap, x2 + w2 + half_gap
+                    moved_x.add(i)
+                    moved_x.add(j)
+                else:
+                    d = overlap_y / 2.0
+                    if y1 + h1 / 2.0 <= y2 + h2 / 2.0:
+                        d = -d
+                    ys[i] = y1 = float(round(max(min_wall_clearance, min(y1 + d, max_y - h1))))
+                    ys[j] = y2 = float(round(max(min_wall_clearance, min(y2 - d, max_y - h2))))
+                    tops[i], bottoms[i] = t1, b1 = y1 - half_gap, y1 + h1 + half_gap
+                    tops[j], bottoms[j] = y2 - half_gap, y2 + h2 + half_gap
+                    moved_y.add(i)
+                    moved_y.add(j)
+                moved_any = True
+                moved_now.add(i)
+                moved_now.add(j)
+                # Both tables moved; refresh their cells and the candidates
+                # left for i (all of them now that i is stale)
+                if grid is not None:
+                    rebucket(i)
+                    rebucket(j)
+                pending = candidates(i, j)
+                pos = 0
+        if not moved_any:
+            break
+        moved_before = moved_now
+    return moved_x, moved_y
+
+
+def _nudge_out_of_zones(xs, ys, ws, hs, zone_rects, min_gap, room_width, room_height, min_wall_clearance):
+    """Move rectangles out of the no-go zones they overlap.
+
+    Companion kernel to ``_resolve_overlaps`` for the last pass of
+    ``optimize_layout``: ``zone_rects`` holds ``(x, y, width, height)``
+    floats, ``xs``/``ys`` are updated in place and the set of moved indexes
+    is returned.
+    """
+    max_x = room_width - min_wall_clearance
+    max_y = room_height - min_wall_clearance
+    nudged = set()
+
+    # With many zones, bucket them into a grid so each table only tests the
+    # zones sharing one of its cells (in the original zone order)
+    zone_grid = None
+    if len(zone_rects) > _ZONE_GRID_MIN_ZONES and all(math.isfinite(v) for r in zone_rects for v in r):
+        avg_extent = sum(max(abs(zw), abs(zh)) for _, _, zw, zh in zone_rects) / len(zone_rects)
+        zone_cell = max(60.0, 3.0 * avg_extent)
+        zone_grid = {}
+        for k, (zx, zy, zw, zh) in enumerate(zone_rects):
+            for key in _span_cells(zx, zy, zw, zh, zone_cell):
+                zone_grid.setdefault(key, []).append(k)
+    all_zone_ids = range(len(zone_rects))
+
+    for i in range(len(xs)):
+        tx, ty, tw, th = xs[i], ys[i], ws[i], hs[i]
+        nudged_to = None
+        zone_ids = all_zone_ids
+        cells = None
+        if zone_grid is not None and math.isfinite(tx + ty + tw + th):
+            cells = _span_cells(tx, ty, tw, th, zone_cell, limit=len(zone_grid))
+        if cells is not None:
+            found = set()
+            for key in cells:
+                found.update(zone_grid.get(key, ()))
+            zone_ids = sorted(found)
+        for k in zone_ids:
+            zx, zy, zw, zh = zone_rects[k]
+            # Check overlap
+            if not (tx + tw <= zx or tx >= zx + zw or ty + th <= zy or ty >= zy + zh):
+                # Nudge out minimally towards nearest edge
+                # Compute overlaps on each side
+                left_overlap = (zx + zw) - tx if tx < zx + zw <= tx + tw else 0
+                right_overlap = (tx + tw) - zx if zx < tx + tw <= zx + zw else 0
+                top_overlap = (zy + zh) - ty if ty < zy + zh <= ty + th else 0
+                bottom_overlap = (ty + th) - zy if zy < ty + th <= zy + zh else 0
+                # Choose axis with greatest overlap
+                candidates = [(left_overlap, 1, 0), (right_overlap, -1, 0), (top_overlap, 0, 1), (bottom_overlap, 0, -1)]
+                # Default nudge
+                dx, dy = 0.0, 0.0
+                if any(val > 0 for val, _, _ in candidates):
+                    val, sx, sy = max(candidates, key=lambda c: c[0])
+                    dx = sx * (val + min_gap)
+                    dy = sy * (val + min_gap)
+                nx = max(min_wall_clearance, min(tx + dx, max_x - tw))
+                ny = max(min_wall_clearance, min(ty + dy, max_y - th))
+                nudged_to = (float(round(nx)), float(round(ny)))
+        # Each overlapping zone nudges from the same starting position; the
+        # last one wins
+        if nudged_to is not None:
+            xs[i], ys[i] = nudged_to
+            nudged.add(i)
+
+    return nudged
+
+
+@dataclass(slots=True)
+class _LayoutTable:
+    """Typed snapshot of the table fields optimize_layout works with."""
+    id: int
+    x: float
+    y: float
+    width: float
+    height: float
+    seats: int
+
+    @classmethod
+    def from_dict(cls, t):
+        return cls(
+            int(t.get("id")),
+            float(t.get("x", 0.0)),
+            float(t.get("y", 0.0)),
+            float(t.get("width", 60.0)),
+            float(t.get("height", 60.0)),
+            int(t.get("seats", 0)),
+        )
+
+
+def _place_pair_horiz(w1, h1, w2, h2, cx, cy, min_gap, min_wall_clearance, max_x, max_y):
+    """Positions for two tables side by side, centred on (cx, cy) and kept in the room."""
+    total_w = w1 + min_gap + w2
+    total_h = max(h1, h2)
+    px = cx - total_w / 2.0
+    py = cy - total_h / 2.0
+    # Clamp the pair as a block
+    px = max(min_wall_clearance, min(px, max_x - total_w))
+    py = max(min_wall_clearance, min(py, max_y - total_h))
+    t1x = px
+    t1y = py + (total_h - h1) / 2.0
+    t2x = px + w1 + min_gap
+    t2y = py + (total_h - h2) / 2.0
+    return (int(round(t1x)), int(round(t1y))), (int(round(t2x)), int(round(t2y)))
+
+
+def _place_pair_vert(w1, h1, w2, h2, cx, cy, min_gap, min_wall_clearance, max_x, max_y):
+    """Positions for two tables one above the other, centred on (cx, cy) and kept in the room."""
+    total_w = max(w1, w2)
+    total_h = h1 + min_gap + h2
+    px = cx - total_w / 2.0
+    py = cy - total_h / 2.0
+    px = max(min_wall_clearance, min(px, max_x - total_w))
+    py = max(min_wall_clearance, min(py, max_y - total_h))
+    t1x = px + (total_w - w1) / 2.0
+    t1y = py
+    t2x = px + (total_w - w2) / 2.0
+    t2y = py + h1 + min_gap
+    return (int(round(t1x)), int(round(t1y))), (int(round(t2x)), int(round(t2y)))
+
+
 def optimize_layout(bookings, tables, constraints):
     """Rule-based layout optimization with deterministic behavior.
 
@@ -759,7 +1586,7 @@ def optimize_layout(bookings, tables, constraints):
     - Maintain basic constraints: room bounds, minimum wall clearance, and try
       to maintain a minimum gap between all tables. Preserve table IDs.
 
-    Returns a new list of tables (deep-copied and modified). If no action is
+    Returns a new list of tables (copied and modified). If no action is
     needed, returns the original tables list unchanged.
     """
     if not tables:
@@ -769,6 +1596,9 @@ def optimize_layout(bookings, tables, constraints):
     max_table_seats = max((int(t.get("seats", 0)) for t in tables), default=0)
     max_party = max((int(b.get("party_size", 0)) for b in (bookings or [])), default=0)
     needs_pairing = max_party > max_table_seats
+    if not needs_pairing:
+        # No large party needing pairing; keep current layout unchanged
+        return tables
 
     # Constraints and defaults
     room = (constraints or {}).get("room", {})
@@ -778,234 +1608,151 @@ def optimize_layout(bookings, tables, constraints):
     min_gap = int(rules.get("min_gap_between_tables", 20))
     min_wall_clearance = int(rules.get("min_wall_clearance", 10))
 
-    # Working copy of tables
-    new_tables = copy.deepcopy(tables)
-
-    # Helper: clamp within room bounds respecting wall clearance
-    def clamp_to_room(x, y, w, h):
-        x = max(min_wall_clearance, min(x, room_width - min_wall_clearance - w))
-        y = max(min_wall_clearance, min(y, room_height - min_wall_clearance - h))
-        return x, y
+    # Far edges a table may reach, respecting wall clearance
+    max_x = room_width - min_wall_clearance
+    max_y = room_height - min_wall_clearance
 
     # Center point
     cx, cy = room_width / 2.0, room_height / 2.0
 
-    # If pairing is required, choose a deterministic best pair and place them near center
-    if needs_pairing:
-        # Build candidate pairs whose combined seats can accommodate the party
-        # Prefer the pair with the smallest seats sum (less wasted seats), then
-        # the shortest current distance to minimize movement, then by (id1,id2).
-        def table_info(t):
-            return (
-                int(t.get("id")),
-                float(t.get("x", 0.0)),
-                float(t.get("y", 0.0)),
-                float(t.get("width", 60.0)),
-                float(t.get("height", 60.0)),
-                int(t.get("seats", 0)),
-            )
-
-        infos = [table_info(t) for t in new_tables]
-
-        def center_of(info):
-            _id, x, y, w, h, _s = info
-            return (x + w / 2.0, y + h / 2.0)
-
-        def dist(a, b):
-            ax, ay = center_of(a)
-            bx, by = center_of(b)
-            return math.hypot(ax - bx, ay - by)
-
-        best_pair = None
-        best_key = None
+    # Pairing is required: choose a deterministic best pair and place them near center
+    # Build candidate pairs whose combined seats can accommodate the party
+    # Prefer the pair with the smallest seats sum (less wasted seats), then
+    # the shortest current distance to minimize movement, then by (id1,id2).
+    infos = [_LayoutTable.from_dict(t) for t in tables]
+    # Table centres, read once for the pair distances below
+    centre_xs = [info.x + info.width / 2.0 for info in infos]
+    centre_ys = [info.y + info.height / 2.0 for info in infos]
+
+    # The preferred pairs all share the smallest feasible seat total, so
+    # find that total first (sorted seats + two pointers) and only compute
+    # distances for pairs that hit it exactly.
+    seats_sorted = sorted(info.seats for info in infos)
+    best_total = None
+    lo, hi = 0, len(seats_sorted) - 1
+    while lo < hi:
+        total = seats_sorted[lo] + seats_sorted[hi]
+        if total >= max_party:
+            if best_total is None or total < best_total:
+                best_total = total
+            hi -= 1
+        else:
+            lo += 1
+
+    positions_by_seats = {}
+    for k, info in enumerate(infos):
+        positions_by_seats.setdefault(info.seats, []).append(k)
+
+    best_pair = None
+    best_key = None
+    if best_total is not None:
         for i in range(len(infos)):
-            for j in range(i + 1, len(infos)):
-                id1, x1, y1, w1, h1, s1 = infos[i]
-                id2, x2, y2, w2, h2, s2 = infos[j]
-                total = s1 + s2
-                if total < max_party:
-                    continue
-                pair_dist = dist(infos[i], infos[j])
-                key = (total, pair_dist, (min(id1, id2), max(id1, id2)))
+            partners = positions_by_seats.get(best_total - infos[i].seats, [])
+            id1 = infos[i].id
+            for j in partners[bisect_right(partners, i):]:
+                id2 = infos[j].id
+                # Squared distance ranks pairs the same without the sqrt
+                dx = centre_xs[i] - centre_xs[j]
+                dy = centre_ys[i] - centre_ys[j]
+                key = (best_total, dx * dx + dy * dy, (min(id1, id2), max(id1, id2)))
                 if best_key is None or key < best_key:
                     best_key = key
                     best_pair = (infos[i], infos[j])
 
-        if best_pair is None:
-            # No feasible pair; nothing we can do beyond keeping existing layout
-            return tables
-
-        # Try to place the pair side-by-side horizontally near center.
-        (id1, x1, y1, w1, h1, s1), (id2, x2, y2, w2, h2, s2) = best_pair
-
-        def place_pair_horiz():
-            total_w = w1 + min_gap + w2
-            total_h = max(h1, h2)
-            px = cx - total_w / 2.0
-            py = cy - total_h / 2.0
-            # Clamp the pair as a block
-            px = max(min_wall_clearance, min(px, room_width - min_wall_clearance - total_w))
-            py = max(min_wall_clearance, min(py, room_height - min_wall_clearance - total_h))
-            t1x = px
-            t1y = py + (total_h - h1) / 2.0
-            t2x = px + w1 + min_gap
-            t2y = py + (total_h - h2) / 2.0
-            return (int(round(t1x)), int(round(t1y))), (int(round(t2x)), int(round(t2y)))
-
-        def place_pair_vert():
-            total_w = max(w1, w2)
-            total_h = h1 + min_gap + h2
-            px = cx - total_w / 2.0
-            py = cy - total_h / 2.0
-            px = max(min_wall_clearance, min(px, room_width - min_wall_clearance - total_w))
-            py = max(min_wall_clearance, min(py, room_height - min_wall_clearance - total_h))
-            t1x = px + (total_w - w1) / 2.0
-            t1y = py
-            t2x = px + (total_w - w2) / 2.0
-            t2y = py + h1 + min_gap
-            return (int(round(t1x)), int(round(t1y))), (int(round(t2x)), int(round(t2y)))
-
-        # Check if horizontal placement fits as a block, else try vertical
-        can_horiz = (w1 + min_gap + w2 + 2 * min_wall_clearance) <= room_width
-        can_vert = (h1 + min_gap + h2 + 2 * min_wall_clearance) <= room_height
-
-        if can_horiz:
-            (nx1, ny1), (nx2, ny2) = place_pair_horiz()
-        elif can_vert:
-            (nx1, ny1), (nx2, ny2) = place_pair_vert()
-        else:
-            # If neither orientation fits within bounds, keep layout unchanged
-            return tables
-
-        # Apply the new positions to the chosen pair, preserve others
-        for t in new_tables:
-            if int(t.get("id")) == id1:
-                t["x"], t["y"] = nx1, ny1
-            elif int(t.get("id")) == id2:
-                t["x"], t["y"] = nx2, ny2
-
-        # Idempotence guard: Only push other tables outward if they are still
-        # relatively close to center (distance less than threshold). This
-        # prevents cumulative drifting on repeated optimization calls.
-        spread_step = max(10, min_gap // 2)
-        distance_threshold = min(room_width, room_height) * 0.15  # 15% of smaller dimension
-        for t in new_tables:
-            tid = int(t.get("id"))
-            if tid in (id1, id2):
-                continue
-            w = float(t.get("width", 60))
-            h = float(t.get("height", 60))
-            x = float(t.get("x", 0))
-            y = float(t.get("y", 0))
-            tcx = x + w / 2.0
-            tcy = y + h / 2.0
-            dist = math.hypot(tcx - cx, tcy - cy)
-            if dist >= distance_threshold:
-                continue  # already sufficiently outward
-            dx = (tcx - cx)
-            dy = (tcy - cy)
-            if dist == 0:
-                ux, uy = 1.0, 0.0
-            else:
-                ux, uy = dx / dist, dy / dist
-            nx = x + ux * spread_step
-            ny = y + uy * spread_step
-            nx, ny = clamp_to_room(nx, ny, w, h)
-            t["x"], t["y"] = int(round(nx)), int(round(ny))
+    if best_pair is None:
+        # No feasible pair; nothing we can do beyond keeping existing layout
+        return tables
+
+    # Try to place the pair side-by-side horizontally near center.
+    first, second = best_pair
+    id1, w1, h1 = first.id, first.width, first.height
+    id2, w2, h2 = second.id, second.width, second.height
+
+    # Check if horizontal placement fits as a block, else try vertical
+    can_horiz = (w1 + min_gap + w2 + 2 * min_wall_clearance) <= room_width
+    can_vert = (h1 + min_gap + h2 + 2 * min_wall_clearance) <= room_height
+
+    if can_horiz:
+        (nx1, ny1), (nx2, ny2) = _place_pair_horiz(
+            w1, h1, w2, h2, cx, cy, min_gap, min_wall_clearance, max_x, max_y
+        )
+    elif can_vert:
+        (nx1, ny1), (nx2, ny2) = _place_pair_vert(
+            w1, h1, w2, h2, cx, cy, min_gap, min_wall_clearance, max_x, max_y
+        )
     else:
-        # No large party needing pairing; keep current layout unchanged
+        # If neither orientation fits within bounds, keep layout unchanged
         return tables
 
-    # 2) Light overlap resolution to try to maintain min_gap
-    # We iterate a few times and separate pairs that are too close
-    def rect_with_gap(table):
-        x = float(table.get("x", 0))
-        y = float(table.get("y", 0))
-        w = float(table.get("width", 60))
-        h = float(table.get("height", 60))
-        half_gap = min_gap / 2.0
-        return (x - half_gap, y - half_gap, x + w + half_gap, y + h + half_gap)
-
-    for _ in range(4):  # a few relaxation iterations
-        moved_any = False
-        for i in range(len(new_tables)):
-            for j in range(i + 1, len(new_tables)):
-                ti = new_tables[i]
-                tj = new_tables[j]
-                x1, y1, w1, h1 = float(ti.get("x", 0)), float(ti.get("y", 0)), float(ti.get("width", 60)), float(ti.get("height", 60))
-                x2, y2, w2, h2 = float(tj.get("x", 0)), float(tj.get("y", 0)), float(tj.get("width", 60)), float(tj.get("height", 60))
-                # Expanded rectangles (include min_gap)
-                l1, t1, r1, b1 = x1, y1, x1 + w1, y1 + h1
-                l2, t2, r2, b2 = x2, y2, x2 + w2, y2 + h2
-                # Overlap including gap requirement
-                half_gap = min_gap / 2.0
-                l1g, t1g, r1g, b1g = l1 - half_gap, t1 - half_gap, r1 + half_gap, b1 + half_gap
-                l2g, t2g, r2g, b2g = l2 - half_gap, t2 - half_gap, r2 + half_gap, b2 + half_gap
-                overlap_x = min(r1g, r2g) - max(l1g, l2g)
-                overlap_y = min(b1g, b2g) - max(t1g, t2g)
-                if overlap_x > 0 and overlap_y > 0:
-                    # Push apart along the smaller overlap axis
-                    if overlap_x < overlap_y:
-                        push = overlap_x / 2.0
-                        c1x = x1 + w1 / 2.0
-                        c2x = x2 + w2 / 2.0
-                        if c1x <= c2x:
-                            x1n = x1 - push
-                            x2n = x2 + push
-                        else:
-                            x1n = x1 + push
-                            x2n = x2 - push
-                        x1n, y1 = clamp_to_room(x1n, y1, w1, h1)
-                        x2n, y2 = clamp_to_room(x2n, y2, w2, h2)
-                        ti["x"], tj["x"] = int(round(x1n)), int(round(x2n))
-                    else:
-                        push = overlap_y / 2.0
-                        c1y = y1 + h1 / 2.0
-                        c2y = y2 + h2 / 2.0
-                        if c1y <= c2y:
-                            y1n = y1 - push
-                            y2n = y2 + push
-                        else:
-                            y1n = y1 + push
-                            y2n = y2 - push
-                        x1, y1n = clamp_to_room(x1, y1n, w1, h1)
-                        x2, y2n = clamp_to_room(x2, y2n, w2, h2)
-                        ti["y"], tj["y"] = int(round(y1n)), int(round(y2n))
-                    moved_any = True
-        if not moved_any:
-            break
+    # From here on every pass works on packed float coordinates taken
+    # from infos (already coerced above); the table dicts are copied and
+    # updated once at the end, for the coordinates that actually moved.
+    xs = [info.x for info in infos]
+    ys = [info.y for info in infos]
+    ws = [info.width for info in infos]
+    hs = [info.height for info in infos]
+    moved = set()
+
+    # Apply the new positions to the chosen pair, preserve others
+    for k, info in enumerate(infos):
+        if info.id == id1:
+            xs[k], ys[k] = float(nx1), float(ny1)
+            moved.add(k)
+        elif info.id == id2:
+            xs[k], ys[k] = float(nx2), float(ny2)
+            moved.add(k)
+
+    # Idempotence guard: Only push other tables outward if they are still
+    # relatively close to center (distance less than threshold). This
+    # prevents cumulative drifting on repeated optimization calls.
+    spread_step = max(10, min_gap // 2)
+    distance_threshold = min(room_width, room_height) * 0.15  # 15% of smaller dimension
+    for k, info in enumerate(infos):
+        if info.id in (id1, id2):
+            continue
+        x, y, w, h = xs[k], ys[k], ws[k], hs[k]
+        tcx = x + w / 2.0
+        tcy = y + h / 2.0
+        dist = math.hypot(tcx - cx, tcy - cy)
+        if dist >= distance_threshold:
+            continue  # already sufficiently outward
+        dx = (tcx - cx)
+        dy = (tcy - cy)
+        if dist == 0:
+            ux, uy = 1.0, 0.0
+        else:
+            ux, uy = dx / dist, dy / dist
+        nx = max(min_wall_clearance, min(x + ux * spread_step, max_x - w))
+        ny = max(min_wall_clearance, min(y + uy * spread_step, max_y - h))
+        xs[k], ys[k] = float(round(nx)), float(round(ny))
+        moved.add(k)
+
+    # 2) Light overlap resolution to try to maintain min_gap, then
+    # 3) nudge away from no-go zones if overlapping (best-effort).
+    moved_x, moved_y = _resolve_overlaps(
+        xs, ys, ws, hs, min_gap, room_width, room_height, min_wall_clearance
+    )
 
-    # 3) Nudge away from no-go zones if overlapping (best-effort)
     zones = (constraints or {}).get("no_go_zones", [])
-    for t in new_tables:
-        tx, ty, tw, th = float(t.get("x", 0)), float(t.get("y", 0)), float(t.get("width", 60)), float(t.get("height", 60))
-        for z in zones:
-            zx, zy = float(z.get("x", 0)), float(z.get("y", 0))
-            zw, zh = float(z.get("width", 0)), float(z.get("height", 0))
-            # Check overlap
-            if not (tx + tw <= zx or tx >= zx + zw or ty + th <= zy or ty >= zy + zh):
-                # Nudge out minimally towards nearest edge
-                # Compute overlaps on each side
-                left_overlap = (zx + zw) - tx if tx < zx + zw <= tx + tw else 0
-                right_overlap = (tx + tw) - zx if zx < tx + tw <= zx + zw else 0
-                top_overlap = (zy + zh) - ty if ty < zy + zh <= ty + th else 0
-                bottom_overlap = (ty + th) - zy if zy < ty + th <= zy + zh else 0
-                # Choose axis with greatest overlap
-                candidates = [(left_overlap, 1, 0), (right_overlap, -1, 0), (top_overlap, 0, 1), (bottom_overlap, 0, -1)]
-                # Default nudge
-                dx, dy = 0.0, 0.0
-                if any(val > 0 for val, _, _ in candidates):
-                    val, sx, sy = max(candidates, key=lambda c: c[0])
-                    dx = sx * (val + min_gap)
-                    dy = sy * (val + min_gap)
-                nx, ny = clamp_to_room(tx + dx, ty + dy, tw, th)
-                t["x"], t["y"] = int(round(nx)), int(round(ny))
+    zone_rects = [
+        (float(z.get("x", 0)), float(z.get("y", 0)), float(z.get("width", 0)), float(z.get("height", 0)))
+        for z in zones
+    ]
+    moved |= _nudge_out_of_zones(
+        xs, ys, ws, hs, zone_rects, min_gap, room_width, room_height, min_wall_clearance
+    )
+
+    # Working copy of tables; only x/y change, so shallow copies suffice
+    new_tables = [dict(t) for t in tables]
+    for i in moved | moved_x:
+        new_tables[i]["x"] = int(xs[i])
+    for i in moved | moved_y:
+        new_tables[i]["y"] = int(ys[i])
 
     return new_tables
 
 @app.route("/tables", methods=["GET"])
 def get_tables():
-    ensure_default_tables()  # create defaults if missing
     tables = load_tables()
     return jsonify(tables)
 
@@ -1046,14 +1793,10 @@ def create_booking():
     if is_form:
         # Form fields from modal
         date_str = request.form.get("date")
-        first_name = request.form.get("first_name", "").strip()
-        last_name = request.form.get("last_name", "").strip()
+        first_name = normalize_name(request.form.get("first_name", ""))
+        last_name = normalize_name(request.form.get("last_name", ""))
         phone = request.form.get("phone", "").strip()
 
-        # Title-case both names
-        first_name = first_name.title()
-        last_name = last_name.title()
-
         # Combine into full name
         name = f"{first_name} {last_name}".strip()
 
@@ -1081,7 +1824,7 @@ def create_booking():
             return jsonify({"error": f"Missing fields: {', '.join(missing)}"}), 400
 
         date_str = data["date"]
-        name = data["name"].strip().title() if isinstance(data["name"], str) else data["name"]
+        name = normalize_name(data["name"])
         party_size = data["party_size"]
         start_time = data["start_time"]
         phone = (data.get("phone", "") or "").strip()
@@ -1089,7 +1832,7 @@ def create_booking():
     
     # Validate booking date (must be today or future, max 2 months ahead)
     try:
-        booking_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+        booking_date = parse_date_param(date_str)
     except ValueError:
         if is_form:
             return redirect(url_for("index"))
@@ -1123,9 +1866,13 @@ def create_booking():
             # Default: 2.5 hours (150 minutes) if no end_time or duration_minutes provided
             duration_minutes = 150
     
-    # Load tables and bookings for the specified date
+    # Load tables and bookings for the specified date; the same bookings list
+    # is checked for availability and then appended to and saved below.
+    # Existing bookings are only read and re-serialised, so the list is a
+    # fresh copy but its booking dicts are shared with the cache.
     booking_app.load_tables()
-    booking_app.load_bookings(date_str)
+    bookings = list(load_bookings_for_date_shared(date_str))
+    booking_app.bookings = bookings
     
     # Find an available table using app.py logic
     table = booking_app.find_available_table(party_size, start_time, duration_minutes)
@@ -1157,8 +1904,7 @@ def create_booking():
     if notes:
         new_booking["notes"] = notes
     
-    # Load existing bookings and append the new one
-    bookings = load_bookings_for_date(date_str)
+    # Append the new booking to the day's bookings
     bookings.append(new_booking)
     save_bookings_for_date(date_str, bookings)
     
@@ -1272,41 +2018,45 @@ def update_booking():
     # Prepare a working copy of bookings without the one being edited for availability checks
     working = [b for i, b in enumerate(bookings_list) if i != idx]
 
+    # id -> table, first occurrence wins (as a linear scan would)
+    tbl_by_id = {}
+    for t in tables_list:
+        tbl_by_id.setdefault(t.get("id"), t)
+
+    # The requested window is the same for every table probed, and only the
+    # bookings on the probed table can clash with it
+    s = booking_app.time_to_minutes(start_time)
+    e = s + duration_minutes
+    working_by_table = booking_app.index_bookings_by_table(working)
+
     # Helper to test availability of a specific table
     def is_table_available(table_id: int) -> bool:
         # capacity
-        tbl = next((t for t in tables_list if t.get("id") == table_id), None)
+        tbl = tbl_by_id.get(table_id)
         if not tbl or tbl.get("seats", 0) < party_size:
             return False
-        s = booking_app.time_to_minutes(start_time)
-        e = s + duration_minutes
-        for b in working:
-            if b.get("table_id") != table_id:
-                continue
-            bs = booking_app.time_to_minutes(b.get("start_time"))
-            be = booking_app.time_to_minutes(b.get("end_time"))
-            if booking_app.times_overlap(s, e, bs, be):
-                return False
-        return True
+        return booking_app.table_is_free(working_by_table.get(table_id, ()), s, e)
 
     # Determine target table
     requested_table_id = data.get("table_id")
     chosen_table = None
     if requested_table_id is not None:
         if is_table_available(int(requested_table_id)):
-            chosen_table = next((t for t in tables_list if t.get("id") == int(requested_table_id)), None)
+            chosen_table = tbl_by_id.get(int(requested_table_id))
     else:
         # try to keep the same table if possible
         current_table_id = bookings_list[idx].get("table_id")
         if current_table_id is not None and is_table_available(int(current_table_id)):
-            chosen_table = next((t for t in tables_list if t.get("id") == int(current_table_id)), None)
+            chosen_table = tbl_by_id.get(int(current_table_id))
 
     # If no table chosen yet, find any available one
     if chosen_table is None:
         # temporarily set booking_app globals for reuse of find_available_table
         booking_app.bookings = working
         booking_app.tables = tables_list
-        chosen_table = booking_app.find_available_table(party_size, start_time, duration_minutes)
+        chosen_table = booking_app.find_available_table(
+            party_size, start_time, duration_minutes, working_by_table
+        )
 
     if chosen_table is None:
         return jsonify({
@@ -1470,7 +2220,7 @@ def edit_booking(date_str, booking_index):
         })
 
     # Read form fields
-    name = request.form.get("name", "").strip()
+    name = normalize_name(request.form.get("name", ""))
     party_size_str = request.form.get("party_size", "0").strip()
     table_ids_list = request.form.getlist("table_ids")  # Get multiple table selections
     new_date_str = request.form.get("date", "").strip()
@@ -1500,12 +2250,9 @@ def edit_booking(date_str, booking_index):
     if not tables:
         tables = booking.get("tables", [])
     
-    # Title case the name
-    name = name.title()
-    
     # Validate date is not in the past or too far in the future
     try:
-        new_date = datetime.strptime(new_date_str, "%Y-%m-%d").date()
+        new_date = parse_date_param(new_date_str)
     except ValueError:
         return redirect(url_for("index", date=original_date))
     
@@ -1554,6 +2301,32 @@ def edit_booking(date_str, booking_index):
     return redirect(url_for("index", date=new_date_str))
 
 
+# Outcome of the last /optimize run per date that left the files untouched
+# ("no optimization needed" or a failed validation), keyed by the stamps of
+# the input files, so identical repeat requests skip the whole pipeline.
+_optimize_memo = {}  # date_str -> (input stamps, response payload, status)
+_optimize_memo_lock = threading.Lock()
+_OPTIMIZE_MEMO_MAX_ENTRIES = 64
+
+
+def _optimize_input_stamps(date_str):
+    return (
+        _file_stamp(TABLES_FILE),
+        _file_stamp(bookings_file_for_date(date_str)),
+        _file_stamp(CONSTRAINTS_FILE),
+    )
+
+
+def _remember_optimize_result(date_str, stamps, payload, status):
+    if stamps is None:
+        return
+    with _optimize_memo_lock:
+        _optimize_memo.pop(date_str, None)
+        if len(_optimize_memo) >= _OPTIMIZE_MEMO_MAX_ENTRIES:
+            _optimize_memo.pop(next(iter(_optimize_memo)))
+        _optimize_memo[date_str] = (stamps, payload, status)
+
+
 @app.route("/optimize", methods=["POST"])
 def optimize():
     """Optimize table layout for a given date.
@@ -1567,11 +2340,21 @@ def optimize():
     if not date_str:
         return jsonify({"error": "Missing 'date' in JSON body"}), 400
 
+    # Same input files as a previous run that changed nothing: same answer
+    stamps = None
+    if isinstance(date_str, str):
+        stamps = _optimize_input_stamps(date_str)
+        with _optimize_memo_lock:
+            memo = _optimize_memo.get(date_str)
+        if memo is not None and memo[0] == stamps:
+            return jsonify(memo[1]), memo[2]
+
     # Build layout request data
     try:
         tables = load_tables() or []
         bookings = load_bookings_for_date(date_str) or []
-        constraints = load_constraints() or {}
+        # optimize_layout/validate_layout only read the constraints
+        constraints = load_constraints_shared() or {}
     except Exception as e:
         return jsonify({"error": f"Failed to load inputs: {e}"}), 500
 
@@ -1589,14 +2372,19 @@ def optimize():
     def tables_positions(tlst):
         return sorted([(t.get('id'), t.get('x'), t.get('y')) for t in tlst])
 
-    changed = tables_positions(optimized_tables) != tables_positions(tables)
+    # optimize_layout hands back the input list itself when it has nothing to do
+    changed = optimized_tables is not tables and (
+        tables_positions(optimized_tables) != tables_positions(tables)
+    )
     if not changed:
-        return jsonify({
+        result = {
             "date": date_str,
             "optimized": False,
             "message": "No optimization needed",
             "tables": optimized_tables
-        })
+        }
+        _remember_optimize_result(date_str, stamps, result, 200)
+        return jsonify(result)
 
     # Validate with local helper and save if valid
     try:
@@ -1605,13 +2393,15 @@ def optimize():
         return jsonify({"error": f"Validation error: {e}"}), 500
 
     if not validation.get("valid"):
-        return jsonify({
+        result = {
             "date": date_str,
             "optimized": False,
             "message": "Layout validation failed",
             "errors": validation.get("errors", []),
             "warnings": validation.get("warnings", []),
-        }), 400
+        }
+        _remember_optimize_result(date_str, stamps, result, 400)
+        return jsonify(result), 400
 
     try:
         save_layout(optimized_tables)
@@ -1660,14 +2450,15 @@ def index():
         return redirect(url_for("login"))
 
     # Determine current date from query parameter, default to today
+    today = date.today()
     date_str = request.args.get("date")
     if date_str:
         try:
-            current_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+            current_date = parse_date_param(date_str)
         except ValueError:
-            current_date = date.today()
+            current_date = today
     else:
-        current_date = date.today()
+        current_date = today
 
     prev_date = current_date - timedelta(days=1)
     next_date = current_date + timedelta(days=1)
@@ -1676,12 +2467,10 @@ def index():
     bookings_for_day = get_bookings_for_day(current_date)
 
     total_bookings = len(bookings_for_day)
-    total_seats = sum(b.get("party_size", 0) for b in bookings_for_day)
+    total_seats = total_party_size_for_date(current_date.isoformat())
 
-    today = date.today()
     max_booking_date = today + timedelta(days=60)
 
-    ensure_default_tables()
     tables = load_tables()
 
     return render_template(
@@ -1719,8 +2508,8 @@ def update_table(table_id):
     if not data:
         return jsonify({"error": "No JSON body"}), 400
 
-    tables = load_tables()
-    table = next((t for t in tables if t["id"] == table_id), None)
+    tables, tables_by_id = load_tables_indexed()
+    table = tables_by_id.get(table_id)
     if table is None:
         return jsonify({"error": "Table not found"}), 404
 
@@ -1744,7 +2533,7 @@ def update_table(table_id):
     if isinstance(section, str) and section.strip():
         table["section"] = section.strip()
 
-    if isinstance(shape, str) and shape.strip() in ("round", "square"):
+    if isinstance(shape, str) and shape.strip() in _VALID_SHAPES:
         table["shape"] = shape.strip()
 
     save_tables(tables)
@@ -1760,8 +2549,8 @@ def edit_table(table_id):
     if "user" not in session:
         return redirect(url_for("login"))
     
-    tables = load_tables()
-    table = next((t for t in tables if t["id"] == table_id), None)
+    tables, tables_by_id = load_tables_indexed()
+    table = tables_by_id.get(table_id)
     if table is None:
         return "Table not found", 404
 
@@ -1786,7 +2575,7 @@ def edit_table(table_id):
         table["section"] = section
 
     # Accept only valid shapes
-    if shape in ("round", "square"):
+    if shape in _VALID_SHAPES:
         table["shape"] = shape
 
     save_tables(tables)
@@ -1806,77 +2595,69 @@ def floorplan():
     if "user" not in session:
         return redirect(url_for("login"))
     
+    # One clock read serves both the default date and the status cut-offs
+    now = datetime.now()
+    today = now.date()
+
     # Determine date (same as Bookings/Calendar)
     date_str = request.args.get("date")
     if date_str:
         try:
-            current_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+            current_date = parse_date_param(date_str)
         except ValueError:
-            current_date = date.today()
+            current_date = today
     else:
-        current_date = date.today()
+        current_date = today
     
     prev_date = current_date - timedelta(days=1)
     next_date = current_date + timedelta(days=1)
     
-    # Load tables, landmarks, and bookings
-    ensure_default_tables()
+    # Load tables, landmarks, and the day's per-table booking schedules
     tables = load_tables()
-    landmarks = load_landmarks()
-    bookings_for_day = get_bookings_for_day(current_date)
+    landmarks = load_landmarks_shared()
+    date_str = current_date.isoformat()
+    bookings, schedules = table_schedules_for_date(date_str)
     
     # Build table_status: table_id -> {"state": ..., "booking": ...}
-    now = datetime.now()
     upcoming_threshold = now + timedelta(minutes=UPCOMING_MINUTES)
     
-    # Start with all tables empty
-    table_status = {t["id"]: {"state": "empty", "booking": None} for t in tables}
-    
-    # Group bookings by table
-    by_table = {}
-    for b in bookings_for_day:
-        table_id = b.get("table_id")
-        if table_id is None:
-            continue
-        
-        # Parse times
-        try:
-            start_time_str = b.get("start_time", "")
-            end_time_str = b.get("end_time", "")
-            date_str_booking = b.get("date", current_date.isoformat())
-            
-            start_dt = datetime.fromisoformat(f"{date_str_booking}T{start_time_str}")
-            end_dt = datetime.fromisoformat(f"{date_str_booking}T{end_time_str}")
-            
-            b_copy = dict(b)
-            b_copy["start_dt"] = start_dt
-            b_copy["end_dt"] = end_dt
-            
-            by_table.setdefault(table_id, []).append(b_copy)
-        except (ValueError, TypeError):
-            continue
-    
-    # Decide status for each table
-    for table_id, blist in by_table.items():
-        # Sort by start time
-        blist.sort(key=lambda x: x["start_dt"])
-        
-        active = None
-        upcoming = None
-        
-        for b in blist:
-            if b["start_dt"] <= now < b["end_dt"]:
-                active = b
+    # Start with all tables empty; they share one status dict, and tables
+    # that get a booking are given their own below
+    table_status = dict.fromkeys((t["id"] for t in tables), {"state": "empty", "booking": None})
+    
+    # Per table, prefer the earliest active booking, else the earliest one
+    # starting within the threshold (ties go to the booking listed first).
+    # Each schedule is sorted by start, so bisect to the bookings around now.
+    for table_id, (starts, entries) in schedules.items():
+        chosen = None
+        state = "occupied"
+        for entry in entries[:bisect_right(starts, now)]:
+            if now < entry[1]:
+                chosen = entry
                 break
-            if b["start_dt"] >= now and b["start_dt"] <= upcoming_threshold:
-                if upcoming is None or b["start_dt"] < upcoming["start_dt"]:
-                    upcoming = b
-        
-        if active:
-            table_status[table_id] = {"state": "occupied", "booking": active}
-        elif upcoming:
-            table_status[table_id] = {"state": "upcoming", "booking": upcoming}
-        # else keep "empty"
+        if chosen is None:
+            state = "upcoming"
+            for entry in entries[bisect_left(starts, now):]:
+                start_dt, end_dt = entry[0], entry[1]
+                if start_dt > upcoming_threshold:
+                    break
+                if not (start_dt <= now < end_dt):
+                    chosen = entry
+                    break
+        if chosen is None:
+            continue  # keep "empty"
+        start_dt, end_dt, idx = chosen
+        # Same fields get_bookings_for_day() would give this booking
+        b = bookings[idx]
+        b = dict(b, tables=list(b["tables"]))
+        b.setdefault("date", date_str)
+        b.setdefault("start_time", "")
+        b.setdefault("end_time", "")
+        b["booking_index"] = idx
+        table_status[table_id] = {
+            "state": state,
+            "booking": dict(b, start_dt=start_dt, end_dt=end_dt),
+        }
     
     return render_template(
         "floorplan.html",
@@ -1891,6 +2672,80 @@ def floorplan():
         landmarks=landmarks,
     )
 
+def _set_int_field(target, source, key):
+    """Copy source[key] into target as an int; missing or non-numeric values are ignored."""
+    if key in source:
+        try:
+            target[key] = int(source[key])
+        except (TypeError, ValueError, OverflowError):
+            pass
+
+def _as_str(value):
+    """str(value), without the call when value already is a str (the usual case)."""
+    return value if isinstance(value, str) else str(value)
+
+
+def _layout_updates(items):
+    """id -> update dict for the entries of a layout payload list."""
+    return {u.get("id"): u for u in items if isinstance(u, dict) and u.get("id")}
+
+
+def _apply_landmark_updates(tables, updates):
+    """Apply landmark position/size updates in place; return how many tables changed."""
+    changed = 0
+    for table in tables:
+        if table.get("id") in updates and table.get("is_landmark"):
+            upd = updates[table["id"]]
+            _set_int_field(table, upd, "x")
+            _set_int_field(table, upd, "y")
+            _set_int_field(table, upd, "width")
+            _set_int_field(table, upd, "height")
+            changed += 1
+    return changed
+
+
+def _apply_table_updates(tables, updates):
+    """Apply full table layout updates in place; return how many tables changed."""
+    changed = 0
+    for table in tables:
+        table_id = table.get("id")
+        if table_id in updates:
+            upd = updates[table_id]
+            
+            # Update position and dimensions
+            _set_int_field(table, upd, "x")
+            _set_int_field(table, upd, "y")
+            _set_int_field(table, upd, "width")
+            _set_int_field(table, upd, "height")
+            
+            # Update table properties
+            if "name" in upd:
+                table["name"] = _as_str(upd["name"])
+            
+            if "capacity" in upd:
+                try:
+                    capacity = int(upd["capacity"])
+                    table["capacity"] = capacity
+                    table["seats"] = capacity  # Keep seats in sync
+                except Exception:
+                    pass
+            
+            if "section" in upd:
+                table["section"] = _as_str(upd["section"])
+            
+            if "shape" in upd:
+                table["shape"] = _as_str(upd["shape"])
+            
+            if "bookable" in upd:
+                table["bookable"] = bool(upd["bookable"])
+            
+            if "is_landmark" in upd:
+                table["is_landmark"] = bool(upd["is_landmark"])
+            
+            changed += 1
+    return changed
+
+
 @app.route("/landmarks/positions", methods=["POST"])
 def update_landmark_positions():
     if "user" not in session:
@@ -1905,22 +2760,12 @@ def update_landmark_positions():
         return jsonify({"error": "No tables found"}), 404
     
     # Create lookup for landmark updates
-    updates = {lm.get("id"): lm for lm in payload["landmarks"] if isinstance(lm, dict) and lm.get("id")}
+    updates = _layout_updates(payload["landmarks"])
     if not updates:
         return jsonify({"error": "No updates"}), 400
     
     # Update landmark table positions
-    changed = 0
-    for table in tables:
-        if table.get("id") in updates and table.get("is_landmark"):
-            upd = updates[table["id"]]
-            for field in ("x", "y", "width", "height"):
-                if field in upd:
-                    try:
-                        table[field] = int(upd[field])
-                    except Exception:
-                        pass
-            changed += 1
+    changed = _apply_landmark_updates(tables, updates)
     
     # Save updated tables
     if changed:
@@ -1950,50 +2795,12 @@ def save_table_layout():
         return jsonify({"error": "No tables found"}), 404
     
     # Create lookup for table updates
-    updates = {t.get("id"): t for t in payload["tables"] if isinstance(t, dict) and t.get("id")}
+    updates = _layout_updates(payload["tables"])
     if not updates:
         return jsonify({"error": "No updates"}), 400
     
     # Update table positions, dimensions, and properties
-    changed = 0
-    for table in tables:
-        table_id = table.get("id")
-        if table_id in updates:
-            upd = updates[table_id]
-            
-            # Update position and dimensions
-            for field in ("x", "y", "width", "height"):
-                if field in upd:
-                    try:
-                        table[field] = int(upd[field])
-                    except Exception:
-                        pass
-            
-            # Update table properties
-            if "name" in upd:
-                table["name"] = str(upd["name"])
-            
-            if "capacity" in upd:
-                try:
-                    capacity = int(upd["capacity"])
-                    table["capacity"] = capacity
-                    table["seats"] = capacity  # Keep seats in sync
-                except Exception:
-                    pass
-            
-            if "section" in upd:
-                table["section"] = str(upd["section"])
-            
-            if "shape" in upd:
-                table["shape"] = str(upd["shape"])
-            
-            if "bookable" in upd:
-                table["bookable"] = bool(upd["bookable"])
-            
-            if "is_landmark" in upd:
-                table["is_landmark"] = bool(upd["is_landmark"])
-            
-            changed += 1
+    changed = _apply_table_updates(tables, updates)
     
     # Save updated tables
     if changed:
@@ -2001,5 +2808,47 @@ def save_table_layout():
     
     return jsonify({"success": True, "updated": changed})
 
+@app.route("/api/save_layout", methods=["POST"])
+def api_save_layout():
+    """Save table and landmark updates together, writing tables.json once.
+
+    Accepts {"tables": [...], "landmarks": [...]}; either list may be omitted.
+    Table updates are applied first, then landmark positions.
+    """
+    if "user" not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Invalid payload"}), 400
+    table_items = payload.get("tables", [])
+    landmark_items = payload.get("landmarks", [])
+    if not isinstance(table_items, list) or not isinstance(landmark_items, list):
+        return jsonify({"error": "Invalid payload"}), 400
+    
+    # Load current tables
+    tables = load_tables()
+    if not tables:
+        return jsonify({"error": "No tables found"}), 404
+    
+    table_updates = _layout_updates(table_items)
+    landmark_updates = _layout_updates(landmark_items)
+    if not table_updates and not landmark_updates:
+        return jsonify({"error": "No updates"}), 400
+    
+    tables_changed = _apply_table_updates(tables, table_updates)
+    landmarks_changed = _apply_landmark_updates(tables, landmark_updates)
+    
+    # One write for the whole layout
+    if tables_changed or landmarks_changed:
+        save_tables(tables)
+    
+    return jsonify({
+        "success": True,
+        "updated_tables": tables_changed,
+        "updated_landmarks": landmarks_changed,
+    })
+
 if __name__ == "__main__":
+    start_cache_refresher()
     app.run(debug=True, host="127.0.0.1", port=5003, use_reloader=False)
@@ -1,8 +1,12 @@
 # ----------------------------
 # TABLE SETUP (loaded from file)
 # ----------------------------
+import copy
 import json
 import os
+import threading
+from collections import Counter
+from functools import lru_cache
 from datetime import datetime, date
 
 # Define base paths
@@ -20,13 +24,71 @@ bookings = []
 current_date = None  # Track which date we're viewing/editing
 constraints = {}  # Restaurant layout constraints and rules
 
+try:
+    import orjson  # optional: much faster JSON parsing/serialisation
+except ImportError:
+    orjson = None
+
+_json_cache = {}  # path -> ((mtime_ns, size), parsed JSON)
+
+
+def _json_bytes(obj):
+    """Serialise obj as 2-space indented UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode("utf-8")
+
+
+def _write_json(path, obj):
+    """Atomically replace `path` with obj serialised by _json_bytes.
+
+    The bytes are written in one go to a temporary file next to `path` and
+    renamed over it, so an interrupted save never leaves a truncated file.
+    """
+    data = _json_bytes(obj)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _json_cache.pop(path, None)
+
+
+def _load_json_cached(path):
+    """Parse a JSON file, reusing the previous result while its mtime/size are unchanged.
+
+    The returned object is shared with the cache; copy it before mutating.
+    """
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _json_cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with open(path, "rb") as f:
+        raw = f.read()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    _json_cache[path] = (stamp, data)
+    return data
+
+
+def _copy_records(data):
+    """Copy a cached list of records so callers can edit or append to it freely."""
+    if isinstance(data, list):
+        return [dict(r) if isinstance(r, dict) else r for r in data]
+    return copy.deepcopy(data)
+
 
 def load_constraints():
     """Load restaurant constraints from restaurant_constraints.json"""
     global constraints
     if os.path.exists(CONSTRAINTS_FILE):
-        with open(CONSTRAINTS_FILE, "r", encoding="utf-8") as f:
-            constraints = json.load(f)
+        constraints = copy.deepcopy(_load_json_cached(CONSTRAINTS_FILE))
         room = constraints.get("room", {})
         print(f"📐 Loaded constraints: {room.get('name', 'Room')} ({room.get('width', 0)}x{room.get('height', 0)})")
     else:
@@ -46,17 +108,20 @@ def load_constraints():
 
 def save_constraints():
     """Save constraints back to restaurant_constraints.json"""
-    with open(CONSTRAINTS_FILE, "w", encoding="utf-8") as f:
-        json.dump(constraints, f, indent=4)
+    _write_json(CONSTRAINTS_FILE, constraints)
+
+
+_default_tables_checked = None  # TABLES_FILE that ensure_default_tables() last ran for
 
 
 def load_tables():
-    """Load tables from tables.json"""
-    global tables
-    ensure_default_tables()  # Create default tables if missing
+    """Load tables from tables.json, creating the default layout on first use."""
+    global tables, _default_tables_checked
+    if _default_tables_checked != TABLES_FILE:
+        ensure_default_tables()  # Create default tables if missing
+        _default_tables_checked = TABLES_FILE
     if os.path.exists(TABLES_FILE):
-        with open(TABLES_FILE, "r", encoding="utf-8") as f:
-            tables = json.load(f)
+        tables = _copy_records(_load_json_cached(TABLES_FILE))
     else:
         tables = []
 
@@ -69,8 +134,7 @@ def ensure_default_tables():
     # If file exists and has tables, do nothing
     if os.path.exists(TABLES_FILE):
         try:
-            with open(TABLES_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = _load_json_cached(TABLES_FILE)
             if isinstance(data, list) and len(data) > 0:
                 return
         except Exception:
@@ -87,14 +151,12 @@ def ensure_default_tables():
         {"id": 5, "seats": 6, "x": 300, "y": 100, "width": 100, "height": 60},
     ]
 
-    with open(TABLES_FILE, "w", encoding="utf-8") as f:
-        json.dump(default_tables, f, indent=2)
+    _write_json(TABLES_FILE, default_tables)
 
 
 def save_tables():
     """Persist tables to tables.json"""
-    with open(TABLES_FILE, "w", encoding="utf-8") as f:
-        json.dump(tables, f, indent=4)
+    _write_json(TABLES_FILE, tables)
 
 
 def list_tables(show_index: bool = False):
@@ -264,8 +326,7 @@ def load_bookings(booking_date=None):
     filename = get_bookings_filename(booking_date)
     
     if os.path.exists(filename):
-        with open(filename, "r", encoding="utf-8") as f:
-            bookings = json.load(f)
+        bookings = _copy_records(_load_json_cached(filename))
     else:
         bookings = []
 
@@ -277,8 +338,7 @@ def save_bookings():
         return
     
     filename = get_bookings_filename(current_date)
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(bookings, f, indent=4)
+    _write_json(filename, bookings)
 
 
 bookings = []  # each booking will have: name, party_size, start_time, end_time, table_id, date
@@ -308,6 +368,7 @@ def normalize_time(raw_time: str) -> str:
     return raw_time
 
 
+@lru_cache(maxsize=4096)
 def time_to_minutes(hhmm: str) -> int:
     """'19:30' -> 1170 minutes since midnight."""
     parts = hhmm.split(":")
@@ -316,6 +377,7 @@ def time_to_minutes(hhmm: str) -> int:
     return hour * 60 + minute
 
 
+@lru_cache(maxsize=4096)
 def minutes_to_time(minutes: int) -> str:
     """1170 -> '19:30'"""
     hour = minutes // 60
@@ -331,29 +393,54 @@ def times_overlap(start1, end1, start2, end2) -> bool:
     return not (end1 <= start2 or end2 <= start1)
 
 
-def find_available_table(party_size, start_time_str, duration_minutes):
-    """Find a table that fits party_size and is free during the time window."""
+def index_tables_by_id(tables_list):
+    """{id: table}; where ids repeat the first table wins, as with a linear search."""
+    by_id = {}
+    for t in tables_list:
+        by_id.setdefault(t['id'], t)
+    return by_id
+
+
+def index_bookings_by_table(day_bookings):
+    """Group bookings by table_id ({table_id: [booking, ...]}), keeping file order."""
+    by_table = {}
+    for b in day_bookings:
+        by_table.setdefault(b.get("table_id"), []).append(b)
+    return by_table
+
+
+def table_is_free(table_bookings, start_minutes, end_minutes):
+    """True if none of one table's bookings overlaps the given window."""
+    to_minutes = time_to_minutes
+    for b in table_bookings:
+        existing_start = to_minutes(b["start_time"])
+        existing_end = to_minutes(b["end_time"])
+        # times_overlap, inlined: this is the innermost availability loop
+        if existing_start < end_minutes and start_minutes < existing_end:
+            return False
+    return True
+
+
+def find_available_table(party_size, start_time_str, duration_minutes, bookings_by_table=None):
+    """Find a table that fits party_size and is free during the time window.
+
+    `bookings_by_table` (from index_bookings_by_table) may be passed in when
+    the caller already has one for the current bookings.
+    """
     start_minutes = time_to_minutes(start_time_str)
     end_minutes = start_minutes + duration_minutes
 
+    # Group the day's bookings by table once, so each candidate table only
+    # checks its own bookings
+    if bookings_by_table is None:
+        bookings_by_table = index_bookings_by_table(bookings)
+
     for table in tables:
         if table["seats"] < party_size:
             continue
 
         # check this table's existing bookings
-        table_is_free = True
-        for b in bookings:
-            if b["table_id"] != table["id"]:
-                continue
-
-            existing_start = time_to_minutes(b["start_time"])
-            existing_end = time_to_minutes(b["end_time"])
-
-            if times_overlap(start_minutes, end_minutes, existing_start, existing_end):
-                table_is_free = False
-                break
-
-        if table_is_free:
+        if table_is_free(bookings_by_table.get(table["id"], ()), start_minutes, end_minutes):
             return table
 
     return None
@@ -519,9 +606,7 @@ def optimize_layout(layout_request=None, bookings_list=None, tables_list=None):
     print(f"   Smallest party: {min(party_sizes)}")
     
     # Count bookings by party size
-    size_counts = {}
-    for size in party_sizes:
-        size_counts[size] = size_counts.get(size, 0) + 1
+    size_counts = Counter(party_sizes)
     
     print(f"\n👥 Party Size Distribution:")
     for size in sorted(size_counts.keys()):
@@ -533,9 +618,7 @@ def optimize_layout(layout_request=None, bookings_list=None, tables_list=None):
     print(f"   Total tables: {len(tables_list)}")
     print(f"   Total capacity: {sum(table_seats)} seats")
     
-    seat_counts = {}
-    for seats in table_seats:
-        seat_counts[seats] = seat_counts.get(seats, 0) + 1
+    seat_counts = Counter(table_seats)
     
     for seats in sorted(seat_counts.keys()):
         print(f"   {seats}-seat tables: {seat_counts[seats]}")
@@ -544,12 +627,13 @@ def optimize_layout(layout_request=None, bookings_list=None, tables_list=None):
     print(f"\n💡 Optimization Suggestions:")
     
     # Suggestion 1: Check for oversized tables
+    tables_by_id = index_tables_by_id(tables_list)
     oversized = []
     for b in bookings_list:
         party = b['party_size']
         table_id = b['table_id']
         # Find the table
-        table = next((t for t in tables_list if t['id'] == table_id), None)
+        table = tables_by_id.get(table_id)
         if table and table['seats'] - party >= 3:
             oversized.append((b['name'], party, table['seats'], table_id))
     
@@ -612,8 +696,6 @@ def _perform_layout_optimization(tables_list, bookings_list, constraints_data, m
     2. Move small tables to edges to free central space
     3. Position larger table groupings in the center
     """
-    import copy
-    
     # Get constraints
     room = constraints_data.get('room', {'width': 800, 'height': 600})
     rules = constraints_data.get('layout_rules', {})
@@ -624,59 +706,75 @@ def _perform_layout_optimization(tables_list, bookings_list, constraints_data, m
     min_gap = rules.get('min_gap_between_tables', 20)
     min_wall_clearance = rules.get('min_wall_clearance', 10)
     
-    # Create a copy of tables to modify
-    new_tables = copy.deepcopy(tables_list)
+    # Create a copy of tables to modify; only x/y are reassigned, so
+    # shallow copies of the table dicts suffice
+    new_tables = [dict(t) for t in tables_list]
     
     # Sort tables by size (smallest first)
     new_tables.sort(key=lambda t: t['seats'])
     
-    # Identify which tables to group
+    # Identify which tables to group, totalling their seats and the width
+    # (with gaps) of the row they'll form as we go
     tables_to_group = []
     remaining_capacity_needed = max_party_size
+    total_grouped_capacity = 0
+    group_row_width = 0
     
     for table in new_tables:
-        if remaining_capacity_needed > 0:
-            tables_to_group.append(table)
-            remaining_capacity_needed -= table['seats']
+        if remaining_capacity_needed <= 0:
+            break
+        tables_to_group.append(table)
+        remaining_capacity_needed -= table['seats']
+        total_grouped_capacity += table['seats']
+        group_row_width += table['width'] + min_gap
     
     if not tables_to_group:
         print("   ❌ No suitable tables found for grouping")
         return None
     
-    total_grouped_capacity = sum(t['seats'] for t in tables_to_group)
-    
     print(f"   📍 Grouping {len(tables_to_group)} tables (capacity: {total_grouped_capacity}) for party of {max_party_size}")
     
+    # Room limits and zone edges are fixed for the whole call; zone edges are
+    # resolved on first use, as the zones are only read once a candidate fits
+    # the room
+    max_x = room_width - min_wall_clearance
+    max_y = room_height - min_wall_clearance
+    zone_edges = []
+
     # Helper function to check if position is valid
     def is_position_valid(x, y, width, height, exclude_table_id=None):
         # Check room boundaries
         if x < min_wall_clearance or y < min_wall_clearance:
             return False
-        if x + width > room_width - min_wall_clearance:
+        if x + width > max_x:
             return False
-        if y + height > room_height - min_wall_clearance:
+        if y + height > max_y:
             return False
         
         # Check no-go zones
-        for zone in no_go_zones:
-            zx, zy = zone['x'], zone['y']
-            zw, zh = zone['width'], zone['height']
-            
+        if no_go_zones and not zone_edges:
+            zone_edges.extend(
+                (z['x'], z['y'], z['x'] + z['width'], z['y'] + z['height']) for z in no_go_zones
+            )
+        right = x + width
+        bottom = y + height
+        for zx, zy, zr, zb in zone_edges:
             # Check if rectangles overlap
-            if not (x + width < zx or x > zx + zw or y + height < zy or y > zy + zh):
+            if not (right < zx or x > zr or bottom < zy or y > zb):
                 return False
         
         # Check overlap with other tables
+        gap_right = right + min_gap
+        gap_bottom = bottom + min_gap
         for table in new_tables:
             if table['id'] == exclude_table_id:
                 continue
             
             tx, ty = table['x'], table['y']
-            tw, th = table['width'], table['height']
             
             # Check if too close (within min_gap)
-            if not (x + width + min_gap < tx or x > tx + tw + min_gap or 
-                    y + height + min_gap < ty or y > ty + th + min_gap):
+            if not (gap_right < tx or x > tx + table['width'] + min_gap or 
+                    gap_bottom < ty or y > ty + table['height'] + min_gap):
                 return False
         
         return True
@@ -686,7 +784,7 @@ def _perform_layout_optimization(tables_list, bookings_list, constraints_data, m
     center_y = room_height // 2
     
     # Try to place tables to group side-by-side in center
-    current_x = center_x - sum(t['width'] + min_gap for t in tables_to_group) // 2
+    current_x = center_x - group_row_width // 2
     current_y = center_y
     
     repositioned_count = 0
@@ -773,13 +871,14 @@ def compute_capacity(bookings_list, tables_list, analysis_date):
     # Calculate wasted seats
     wasted_seats = 0
     booking_details = []
+    tables_by_id = index_tables_by_id(tables_list)
     
     for booking in bookings_list:
         party_size = booking['party_size']
         table_id = booking['table_id']
         
         # Find the table
-        table = next((t for t in tables_list if t['id'] == table_id), None)
+        table = tables_by_id.get(table_id)
         if table:
             table_seats = table['seats']
             waste = table_seats - party_size
@@ -945,8 +1044,8 @@ def export_layout_request(request_date, filename=None):
             filename += '.json'
         
         # Write to file with pretty formatting
-        with open(filename, 'w') as f:
-            json.dump(layout_request, f, indent=4, sort_keys=False)
+        with open(filename, 'wb') as f:
+            f.write(_json_bytes(layout_request))
         
         # Calculate file size for feedback
         file_size = os.path.getsize(filename)
@@ -194,7 +194,7 @@
       const tables = collectTablesPayload();
       if (!tables || tables.length === 0) return;
 
-      fetch('/api/save_table_layout', {
+      fetch('/api/save_layout', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ tables })
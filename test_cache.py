@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Test cache invalidation, ETag revalidation and layout saves in the API
+
+Runs against a temporary data directory, so the files under data/ are left alone.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import api
+
+data_dir = Path(tempfile.mkdtemp(prefix="seatelligence_test_"))
+api.DATA_DIR = data_dir
+api.TABLES_FILE = data_dir / "tables.json"
+api.CONSTRAINTS_FILE = data_dir / "restaurant_constraints.json"
+api.LANDMARKS_FILE = os.path.join(data_dir, "landmarks.json")
+
+api.ensure_default_tables()
+default_tables = api.load_tables()
+
+client = api.app.test_client()
+with client.session_transaction() as sess:
+    sess["user"] = "admin"
+
+DATE = "2025-11-10"
+
+print('🧪 Testing cache invalidation, ETags and layout saves\n')
+
+# Test 1: Saves are visible to the next load
+print('TEST 1: Loads see saved data straight away')
+print('=' * 70)
+
+assert api.load_bookings_for_date(DATE) == []
+api.save_bookings_for_date(DATE, [{"name": "Cache Test", "party_size": 2, "start_time": "18:00",
+                                   "end_time": "19:30", "table_id": 1}])
+assert [b["name"] for b in api.load_bookings_for_date(DATE)] == ["Cache Test"]
+print('✅ Bookings saved for a date are returned by the next load')
+
+tables = api.load_tables()
+tables[0]["x"] += 20
+api.save_tables(tables)
+assert api.load_tables()[0]["x"] == tables[0]["x"]
+print('✅ Table changes are returned by the next load')
+
+leftovers = [p.name for p in data_dir.iterdir() if p.name.endswith(".tmp")]
+assert not leftovers, leftovers
+print('✅ Atomic writes leave no temporary files behind')
+print()
+
+# Test 2: validate_layout is re-run when tables.json changes
+print('TEST 2: validate_layout notices a changed tables.json')
+print('=' * 70)
+
+constraints = {"room": {"width": 2000, "height": 2000}}
+candidate = [dict(t, x=i * 100, y=0) for i, t in enumerate(api.load_tables())]
+assert api.validate_layout(candidate, constraints)["valid"]
+api.save_tables(api.load_tables()[:-1])
+result = api.validate_layout(candidate, constraints)
+assert "Table IDs changed; IDs must be preserved" in result["errors"], result
+print('✅ Removing a table from tables.json invalidates the memoised result')
+api.save_tables(default_tables)
+print()
+
+# Test 3: ETag revalidation on /api/available-times
+print('TEST 3: /api/available-times answers 304 until the data changes')
+print('=' * 70)
+
+url = f"/api/available-times?date={DATE}&guests=2"
+first = client.get(url)
+assert first.status_code == 200 and first.headers.get("ETag"), first.status_code
+etag = first.headers["ETag"]
+
+repeat = client.get(url, headers={"If-None-Match": etag})
+assert repeat.status_code == 304, repeat.status_code
+print(f'✅ Unchanged data: 304 for ETag {etag}')
+
+api.save_bookings_for_date(DATE, [])
+changed = client.get(url, headers={"If-None-Match": etag})
+assert changed.status_code == 200, changed.status_code
+assert changed.headers["ETag"] != etag
+print('✅ After saving bookings: 200 with a new ETag')
+print()
+
+# Test 4: Combined layout save
+print('TEST 4: POST /api/save_layout updates tables and landmarks together')
+print('=' * 70)
+
+tables = api.load_tables()
+tables[-1]["is_landmark"] = True
+api.save_tables(tables)
+table, landmark = tables[0], tables[-1]
+response = client.post("/api/save_layout", json={
+    "tables": [{"id": table["id"], "x": 40, "y": 60}],
+    "landmarks": [{"id": landmark["id"], "x": 300, "y": 320}],
+})
+assert response.status_code == 200, response.get_json()
+assert response.get_json()["success"]
+
+by_id = {t["id"]: t for t in api.load_tables()}
+assert (by_id[table["id"]]["x"], by_id[table["id"]]["y"]) == (40, 60)
+assert (by_id[landmark["id"]]["x"], by_id[landmark["id"]]["y"]) == (300, 320)
+print('✅ Both updates were saved and are returned by the next load')
+print()
+
+shutil.rmtree(data_dir)
+print('🎉 All cache tests passed')
@@ -1,4 +1,5 @@
-from api import app
+from api import app, start_cache_refresher
 
 # This exposes the Flask app as 'app' for Gunicorn
 # Usage: gunicorn wsgi:app
+start_cache_refresher()